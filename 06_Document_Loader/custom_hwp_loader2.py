@@ -2,155 +2,194 @@
 import os
 import olefile
 import zlib
-import struct
-from typing import Iterator, List
+from typing import Iterator, List, Tuple
 from langchain_core.documents import Document
 from langchain_core.document_loaders.base import BaseLoader
 
+from hwp_records import parse_para_text
+
+# 섹션 스트림을 읽는 단위 (압축 해제도 이 단위로 점진 처리)
+CHUNK_SIZE = 64 * 1024
+
+# FileHeader: 32바이트 시그니처 + 4바이트 버전 뒤의 속성 플래그 (bit 0 = 압축)
+FILE_HEADER_PROPERTIES_OFFSET = 36
+
+
 class CustomHWPLoader(BaseLoader):
-    """한컴 공식 방법 기반 HWP 로더"""
+    """한컴 공식 방법 기반 HWP 로더 (섹션 단위 스트리밍)"""
     
-    def __init__(self, file_path: str):
+    # 추출 결과가 달라지는 변경 시 올림 (추출 캐시 키에 사용)
+    VERSION = "2.1"
+    
+    def __init__(
+        self,
+        file_path: str,
+        chunk_size: int = CHUNK_SIZE,
+        verbose: bool = True,
+        strict: bool = False
+    ):
+        """
+        Args:
+            file_path: HWP 파일 경로
+            chunk_size: 섹션 스트림 읽기 단위 (bytes)
+            verbose: 진행 상황 출력 여부
+            strict: True면 실패 시 실패 텍스트 Document 대신 예외 발생
+        """
         self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.verbose = verbose
+        self.strict = strict
+    
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
     
     def lazy_load(self) -> Iterator[Document]:
-        """HWP 파일을 로드하여 Document로 변환"""
+        """HWP 파일을 BodyText 섹션 하나당 Document 하나로 변환"""
         try:
-            text_content = self._extract_hwp_text()
-            
-            metadata = {
-                "source": self.file_path,
-                "file_type": "hwp",
-                "extraction_method": "hancom_official"
-            }
-            
-            yield Document(
-                page_content=text_content,
-                metadata=metadata
-            )
-            
+            f = olefile.OleFileIO(self.file_path)
         except Exception as e:
-            print(f"HWP 로딩 오류: {e}")
-            yield Document(
-                page_content=f"HWP 파일 로딩 실패: {e}",
-                metadata={"source": self.file_path, "error": str(e)}
-            )
-    
-    def _extract_hwp_text(self) -> str:
-        """한컴 공식 방법으로 HWP 텍스트 추출"""
+            if self.strict:
+                raise
+            self._log(f"HWP 로딩 오류: {e}")
+            yield self._error_document(e)
+            return
+        
         try:
-            f = olefile.OleFileIO(self.file_path)
-            dirs = f.listdir()
-            
-            print(f"📁 HWP 내부 구조:")
-            for d in dirs:
-                print(f"  - {'/'.join(d) if isinstance(d, list) else d}")
+            sections, is_compressed = self._find_sections(f)
             
-            # HWP 파일 검증
-            if ["FileHeader"] not in dirs or ["\\x05HwpSummaryInformation"] not in dirs:
-                print("⚠️  HWP 파일 형식이 아닙니다")
-                return self._try_prvtext_method(f)
+            if not sections:
+                self._log("📄 BodyText 섹션을 찾을 수 없음, PrvText 방법 시도")
+                yield self._prvtext_document(f)
+                return
             
-            # 문서 포맷 압축 여부 확인
-            header = f.openstream("FileHeader")
-            header_data = header.read()
-            is_compressed = (header_data & 1) == 1
-            print(f"🗜️  압축 여부: {is_compressed}")
+            self._log(f"📑 발견된 섹션: {sections}")
             
-            # Body Sections 찾기
-            nums = []
-            for d in dirs:
-                if isinstance(d, list) and len(d) >= 2 and d == "BodyText":
-                    try:
-                        section_num = int(d[21][len("Section"):])
-                        nums.append(section_num)
-                    except:
-                        continue
-            
-            if not nums:
-                print("📄 BodyText 섹션을 찾을 수 없음, PrvText 방법 시도")
-                return self._try_prvtext_method(f)
-                
-            sections = [f"BodyText/Section{x}" for x in sorted(nums)]
-            print(f"📑 발견된 섹션: {sections}")
-            
-            # 전체 텍스트 추출
-            text = ""
-            for section in sections:
+            produced = False
+            for index, section in enumerate(sections):
                 try:
-                    print(f"🔍 섹션 처리 중: {section}")
-                    bodytext = f.openstream(section)
-                    data = bodytext.read()
-                    
-                    if is_compressed:
-                        unpacked_data = zlib.decompress(data, -15)
-                    else:
-                        unpacked_data = data
-                    
-                    # 각 섹션 내 텍스트 추출
-                    section_text = self._extract_section_text(unpacked_data)
-                    text += section_text + "\n"
-                    
+                    self._log(f"🔍 섹션 처리 중: {section}")
+                    section_text = self._extract_section(f, section, is_compressed)
                 except Exception as e:
-                    print(f"❌ 섹션 {section} 처리 오류: {e}")
+                    if self.strict:
+                        raise
+                    self._log(f"❌ 섹션 {section} 처리 오류: {e}")
+                    continue
+                
+                if not section_text.strip():
                     continue
+                
+                produced = True
+                yield Document(
+                    page_content=section_text,
+                    metadata={
+                        "source": self.file_path,
+                        "file_type": "hwp",
+                        "extraction_method": "hancom_official",
+                        "section": index,
+                        "section_name": section,
+                    }
+                )
             
-            return text if text.strip() else self._try_prvtext_method(f)
+            if not produced:
+                yield self._prvtext_document(f)
             
         except Exception as e:
-            print(f"❌ HWP 추출 오류: {e}")
-            return f"HWP 추출 실패: {e}"
+            if self.strict:
+                raise
+            self._log(f"HWP 로딩 오류: {e}")
+            yield self._error_document(e)
         finally:
-            if 'f' in locals():
-                f.close()
+            f.close()
     
-    def _extract_section_text(self, unpacked_data: bytes) -> str:
-        """섹션 데이터에서 텍스트 추출"""
-        section_text = ""
-        i = 0
-        size = len(unpacked_data)
+    def _find_sections(self, f) -> Tuple[List[str], bool]:
+        """BodyText 섹션 목록(번호 순)과 압축 여부"""
+        dirs = f.listdir()
         
-        try:
-            while i < size:
-                if i + 4 > size:
-                    break
-                    
-                header = struct.unpack_from("<I", unpacked_data, i)
-                rec_type = header & 0x3ff
-                rec_len = (header >> 20) & 0xfff
-                
-                # 텍스트 레코드 타입 (67번)
-                #if rec_type in :
-                if rec_type == 67:
-                    if i + 4 + rec_len <= size:
-                        rec_data = unpacked_data[i + 4:i + 4 + rec_len]
-                        try:
-                            text = rec_data.decode('utf-16le')
-                            section_text += text + "\n"
-                        except:
-                            try:
-                                text = rec_data.decode('utf-16')
-                                section_text += text + "\n"
-                            except:
-                                pass
-                
-                i += 4 + rec_len
-                
-        except Exception as e:
-            print(f"⚠️  섹션 텍스트 추출 중 오류: {e}")
+        if self.verbose:
+            print(f"📁 HWP 내부 구조:")
+            for d in dirs:
+                print(f"  - {'/'.join(d) if isinstance(d, list) else d}")
+        
+        # HWP 파일 검증
+        if ["FileHeader"] not in dirs or ["\x05HwpSummaryInformation"] not in dirs:
+            self._log("⚠️  HWP 파일 형식이 아닙니다")
+            return [], False
         
-        return section_text
+        # 문서 포맷 압축 여부 확인
+        header_data = f.openstream("FileHeader").read()
+        is_compressed = bool(header_data[FILE_HEADER_PROPERTIES_OFFSET] & 1)
+        self._log(f"🗜️  압축 여부: {is_compressed}")
+        
+        # Body Sections 찾기 (["BodyText", "Section0"], ...)
+        nums = []
+        for d in dirs:
+            if len(d) == 2 and d[0] == "BodyText" and d[1].startswith("Section"):
+                try:
+                    nums.append(int(d[1][len("Section"):]))
+                except ValueError:
+                    continue
+        
+        sections = [f"BodyText/Section{x}" for x in sorted(nums)]
+        return sections, is_compressed
+    
+    def _extract_section(self, f, section: str, is_compressed: bool) -> str:
+        """
+        섹션 스트림을 chunk_size 단위로 읽으며 점진적으로 압축 해제 + 레코드 파싱
+        
+        전체 섹션을 메모리에 올리지 않고, 아직 완성되지 않은 마지막 레코드만 버퍼에 남긴다.
+        """
+        stream = f.openstream(section)
+        decompressor = zlib.decompressobj(-15) if is_compressed else None
+        
+        buffer = bytearray()
+        parts: List[str] = []
+        
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            buffer += chunk
+            consumed = parse_para_text(buffer, parts)
+            del buffer[:consumed]
+        
+        if decompressor is not None:
+            buffer += decompressor.flush()
+            parse_para_text(buffer, parts)
+        
+        return "".join(parts)
+    
+    def _prvtext_document(self, f) -> Document:
+        """PrvText 미리보기 텍스트로 만든 Document"""
+        return Document(
+            page_content=self._try_prvtext_method(f),
+            metadata={
+                "source": self.file_path,
+                "file_type": "hwp",
+                "extraction_method": "prvtext",
+            }
+        )
+    
+    def _error_document(self, e: Exception) -> Document:
+        return Document(
+            page_content=f"HWP 파일 로딩 실패: {e}",
+            metadata={"source": self.file_path, "error": str(e)}
+        )
     
     def _try_prvtext_method(self, f) -> str:
         """PrvText 방법으로 텍스트 추출 (백업 방법)"""
         try:
-            print("🔄 PrvText 방법으로 시도 중...")
+            self._log("🔄 PrvText 방법으로 시도 중...")
             encoded_text = f.openstream('PrvText').read()
             decoded_text = encoded_text.decode('UTF-16le')
-            print("✅ PrvText 방법 성공!")
+            self._log("✅ PrvText 방법 성공!")
             return decoded_text
         except Exception as e:
-            print(f"❌ PrvText 방법도 실패: {e}")
+            if self.strict:
+                raise
+            self._log(f"❌ PrvText 방법도 실패: {e}")
             return f"모든 추출 방법 실패: PrvText 오류 - {e}"
 
 '''
@@ -0,0 +1,179 @@
+# 06_Document_Loader/hwp_batch_loader.py - 디렉토리 단위 HWP 병렬 로더
+import glob
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+from langchain_core.documents import Document
+from langchain_core.document_loaders.base import BaseLoader
+
+from custom_hwp_loader2 import CHUNK_SIZE, CustomHWPLoader
+
+
+class HWPLoadError(NamedTuple):
+    """파일 하나의 로딩 실패 기록"""
+    source: str
+    error_type: str
+    message: str
+
+
+class HWPLoadResult(NamedTuple):
+    """파일 하나의 로딩 결과 (documents 또는 error 중 하나)"""
+    source: str
+    documents: List[Document]
+    error: Optional[HWPLoadError] = None
+
+
+def _failure(path: str, e: BaseException) -> HWPLoadResult:
+    """예외 → 실패 결과"""
+    return HWPLoadResult(path, [], HWPLoadError(path, type(e).__name__, str(e)))
+
+
+def _load_hwp_file(path: str, chunk_size: int = CHUNK_SIZE) -> HWPLoadResult:
+    """워커 프로세스에서 파일 하나 파싱 (예외는 오류 기록으로 변환)"""
+    try:
+        loader = CustomHWPLoader(path, chunk_size=chunk_size, verbose=False, strict=True)
+        return HWPLoadResult(path, loader.load())
+    except Exception as e:
+        return _failure(path, e)
+
+
+class HWPBatchLoader(BaseLoader):
+    """
+    디렉토리 / glob 단위 HWP 병렬 로더
+
+    - 파일 파싱(zlib 해제 + 디코딩)은 CPU 작업이므로 프로세스 풀에서 실행
+    - 끝난 파일부터 Document를 바로 반환 (완료 순서)
+    - 실패한 파일은 실패 텍스트 Document 대신 errors에 HWPLoadError로 기록
+    - 워커 프로세스가 죽으면 (segfault, OOM 등) 새 풀에서 진행 중이던 파일을 하나씩 다시 실행해서
+      혼자 실행해도 워커를 죽이는 파일만 오류로 기록
+
+    Examples:
+        >>> loader = HWPBatchLoader("data/hwp", max_workers=8)
+        >>> for doc in loader.lazy_load():
+        ...     ...
+        >>> loader.errors   # [HWPLoadError(source, error_type, message), ...]
+    """
+
+    # 워커에서 실행할 파일 하나 로딩 함수 (pickle 가능한 모듈 수준 함수)
+    load_file = staticmethod(_load_hwp_file)
+
+    def __init__(
+        self,
+        path: Union[str, Iterable[str]],
+        glob_pattern: str = "**/*.hwp",
+        max_workers: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_pending: Optional[int] = None
+    ):
+        """
+        Args:
+            path: 디렉토리, glob 패턴, 또는 파일 경로 목록
+            glob_pattern: path가 디렉토리일 때 사용할 패턴
+            max_workers: 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 순차 처리)
+            chunk_size: 섹션 스트림 읽기 단위 (bytes)
+            max_pending: 동시에 제출해 둘 최대 파일 수 (기본: max_workers * 4)
+        """
+        self.path = path
+        self.glob_pattern = glob_pattern
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or self.max_workers * 4
+        self.errors: List[HWPLoadError] = []
+
+    def _iter_paths(self) -> Iterator[str]:
+        """대상 HWP 파일 경로"""
+        if not isinstance(self.path, str):
+            yield from self.path
+        elif os.path.isdir(self.path):
+            pattern = os.path.join(self.path, self.glob_pattern)
+            yield from sorted(glob.iglob(pattern, recursive=True))
+        else:
+            yield from sorted(glob.iglob(self.path, recursive=True))
+
+    def iter_results(self) -> Iterator[HWPLoadResult]:
+        """파일별 결과를 완료 순서대로 반환"""
+        paths = self._iter_paths()
+
+        if self.max_workers == 1:
+            for path in paths:
+                yield self.load_file(path, self.chunk_size)
+            return
+
+        # 풀이 깨질 때 진행 중이던 파일 (어느 파일이 워커를 죽였는지 모르므로 새 풀에서 하나씩 실행)
+        suspects: List[str] = []
+        while True:
+            pending: Dict[Future, str] = {}
+            submitting = None
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                try:
+                    while suspects:
+                        path = suspects.pop(0)
+                        try:
+                            result = executor.submit(self.load_file, path, self.chunk_size).result()
+                        except BrokenProcessPool as e:
+                            # 혼자 실행해도 워커가 죽음 → 이 파일만 실패, 풀 다시 생성
+                            yield _failure(path, e)
+                            raise
+                        except Exception as e:
+                            result = _failure(path, e)
+                        yield result
+
+                    # 수만 개 파일도 한꺼번에 제출하지 않도록 max_pending 개씩만 유지
+                    for path in paths:
+                        submitting = path
+                        pending[executor.submit(self.load_file, path, self.chunk_size)] = path
+                        submitting = None
+                        if len(pending) >= self.max_pending:
+                            yield from self._drain(pending)
+                    while pending:
+                        yield from self._drain(pending)
+                    return
+                except BrokenProcessPool:
+                    # 풀이 깨지기 전에 끝난 작업은 결과 그대로, 나머지는 다시 실행할 파일
+                    for future, path in pending.items():
+                        if future.done() and future.exception() is None:
+                            yield future.result()
+                        else:
+                            suspects.append(path)
+                    if submitting is not None:
+                        suspects.append(submitting)
+
+    @staticmethod
+    def _drain(pending: Dict[Future, str]) -> Iterator[HWPLoadResult]:
+        """
+        완료된 작업 결과 꺼내기
+
+        워커 프로세스가 죽은 경우(BrokenProcessPool)는 pending에 남겨 둔 채 예외를 올려
+        iter_results가 새 풀에서 다시 실행하도록 한다.
+        """
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                result = _failure(pending[future], e)
+            del pending[future]
+            yield result
+
+    def lazy_load(self) -> Iterator[Document]:
+        """모든 파일의 Document를 완료 순서대로 반환 (실패는 self.errors에 기록)"""
+        self.errors = []
+        for result in self.iter_results():
+            if result.error is not None:
+                self.errors.append(result.error)
+            else:
+                yield from result.documents
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    loader = HWPBatchLoader(os.path.join(current_dir, "data"))
+
+    docs = loader.load()
+    print(f"🎉 로드된 문서: {len(docs)}")
+    print(f"❌ 실패한 파일: {len(loader.errors)}")
+    for error in loader.errors:
+        print(f"  - {error.source}: {error.error_type} {error.message}")
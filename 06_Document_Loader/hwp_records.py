@@ -0,0 +1,108 @@
+# 06_Document_Loader/hwp_records.py - HWP 레코드 스트림 파서
+import struct
+from typing import Iterator, List, Tuple, Union
+
+import numpy as np
+
+# 레코드 헤더: Tag ID (10 bit) | Level (10 bit) | Size (12 bit)
+HWPTAG_BEGIN = 0x10
+HWPTAG_PARA_TEXT = HWPTAG_BEGIN + 51   # 67
+
+# Size가 0xfff면 헤더 뒤 4바이트에 실제 크기가 들어있음 (긴 문단)
+EXTENDED_SIZE = 0xfff
+
+_HEADER = struct.Struct("<I")
+
+# 인라인/확장 컨트롤: 컨트롤 문자 + 정보 6 + 컨트롤 문자 = 8 WCHAR
+_WIDE_CONTROL_LEN = 8
+_WIDE_CONTROL_CODES = np.zeros(32, dtype=bool)
+_WIDE_CONTROL_CODES[[*range(1, 10), 11, 12, *range(14, 24)]] = True
+
+# 문자 컨트롤(1 WCHAR): 줄바꿈(10)만 남기고, 묶음/고정폭 빈칸은 공백, 나머지는 제거
+_CHAR_CONTROL_TABLE = {code: None for code in range(32)}
+_CHAR_CONTROL_TABLE[10] = "\n"
+_CHAR_CONTROL_TABLE[30] = " "
+_CHAR_CONTROL_TABLE[31] = " "
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def iter_records(data: Buffer, start: int = 0) -> Iterator[Tuple[int, int, int]]:
+    """
+    레코드 스트림 순회 (데이터 복사 없이 위치만 반환, 선형 시간)
+
+    Args:
+        data: 압축 해제된 섹션 데이터
+        start: 시작 위치
+
+    Yields:
+        (tag_id, 데이터 시작, 데이터 끝) - 끝이 len(data)를 넘는 불완전 레코드는 제외
+    """
+    size = len(data)
+    i = start
+
+    while i + 4 <= size:
+        header, = _HEADER.unpack_from(data, i)
+        tag_id = header & 0x3ff
+        rec_len = header >> 20
+        body = i + 4
+
+        if rec_len == EXTENDED_SIZE:
+            if body + 4 > size:
+                return
+            rec_len, = _HEADER.unpack_from(data, body)
+            body += 4
+
+        end = body + rec_len
+        if end > size:
+            return
+
+        yield tag_id, body, end
+        i = end
+
+
+def parse_para_text(data: Buffer, parts: List[str]) -> int:
+    """
+    HWPTAG_PARA_TEXT 레코드만 디코딩해서 parts에 추가 (문단당 한 줄)
+
+    Args:
+        data: 압축 해제된 섹션 데이터 (일부여도 됨)
+        parts: 문단 텍스트를 추가할 리스트
+
+    Returns:
+        처리한 바이트 수 (그 뒤의 불완전 레코드는 다음 데이터와 이어서 처리)
+    """
+    consumed = 0
+
+    # memoryview 슬라이스로 레코드 복사 없이 디코딩 (반환 전에 해제 → 호출 측 bytearray 크기 변경 가능)
+    with memoryview(data) as view:
+        for tag_id, body, end in iter_records(data):
+            if tag_id == HWPTAG_PARA_TEXT:
+                with view[body:end] as record:
+                    parts.append(decode_para_text(record) + "\n")
+            consumed = end
+
+    return consumed
+
+
+def decode_para_text(record: Buffer) -> str:
+    """
+    PARA_TEXT 레코드 → 문단 텍스트
+
+    인라인/확장 컨트롤(8 WCHAR)은 디코딩 전에 WCHAR 단위로 제거한다.
+    (컨트롤 정보에 짝 없는 서로게이트가 있어도 뒤 텍스트 위치가 밀리지 않음)
+    """
+    units = np.frombuffer(record, dtype="<u2", count=len(record) // 2)
+
+    # 컨트롤 후보 중 앞 컨트롤 정보 안에 들어간 것은 건너뜀 (후보만 순회)
+    candidates = np.flatnonzero((units < 32) & _WIDE_CONTROL_CODES[np.minimum(units, 31)])
+    if len(candidates):
+        keep = np.ones(len(units), dtype=bool)
+        next_free = 0
+        for pos in candidates.tolist():
+            if pos >= next_free:
+                keep[pos:pos + _WIDE_CONTROL_LEN] = False
+                next_free = pos + _WIDE_CONTROL_LEN
+        units = units[keep]
+
+    return units.tobytes().decode("utf-16-le", "ignore").translate(_CHAR_CONTROL_TABLE)
@@ -0,0 +1,77 @@
+# 06_Document_Loader/tests/test_audio_utils.py - 무음 검출 결과를 pydub과 비교
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytube")
+pytest.importorskip("moviepy.editor")
+silence = pytest.importorskip("pydub.silence")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+from pydub import AudioSegment
+
+from audio_utils import AudioChunk, detect_nonsilent, segment_samples, snap_split_points, write_audio
+
+
+def _bursts(dtype, frame_rate, channels, seconds=3, seed=0):
+    # 최대 진폭 근처의 소리 구간과 작은 잡음 구간이 번갈아 나오는 신호
+    rng = np.random.default_rng(seed)
+    peak = np.iinfo(dtype).max
+    n = frame_rate * seconds
+    samples = rng.integers(-peak // 1000, peak // 1000, size=(n, channels))
+    for start in rng.integers(0, n - frame_rate // 4, size=6):
+        samples[start:start + frame_rate // 5] = rng.integers(-peak, peak, size=(frame_rate // 5, channels))
+    return samples.astype(dtype)
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.int32])
+@pytest.mark.parametrize("channels", [1, 2])
+def test_detect_nonsilent_matches_pydub(dtype, channels):
+    frame_rate = 8000
+    samples = _bursts(dtype, frame_rate, channels)
+    audio = AudioSegment(
+        data=samples.tobytes(),
+        sample_width=samples.dtype.itemsize,
+        frame_rate=frame_rate,
+        channels=channels,
+    )
+    kwargs = dict(min_silence_len=100, silence_thresh=-30, seek_step=5)
+
+    expected = silence.detect_nonsilent(audio, **kwargs)
+    got = detect_nonsilent(
+        segment_samples(audio), frame_rate, amplitude=audio.max_possible_amplitude, **kwargs
+    )
+
+    assert got == expected
+    assert expected  # 소리 구간이 실제로 있는 신호인지
+
+
+def test_non_silent_output_same_in_every_mode(tmp_path):
+    frame_rate = 16000
+    samples = _bursts(np.int16, frame_rate, 1)
+    path = write_audio(samples, frame_rate, str(tmp_path / "speech.wav"))
+
+    outputs = [
+        AudioChunk(path).non_silent_audios_output,
+        AudioChunk(path, streaming=True).non_silent_audios_output,
+        AudioChunk(samples=samples, frame_rate=frame_rate).non_silent_audios_output,
+    ]
+
+    assert len(outputs[0]) > 0
+    assert all(output.raw_data == outputs[0].raw_data for output in outputs)
+
+
+@pytest.mark.parametrize(
+    "silent_ranges, expected",
+    [
+        ([[103_000, 200_000]], [103_000, 200_000]),  # 가운데는 멀지만 끝은 tolerance 이내
+        ([[97_000, 104_000]], [100_000, 200_000]),   # target이 무음 안
+        ([[101_000, 106_000]], [103_500, 203_500]),  # 가운데가 tolerance 이내
+        ([[120_000, 130_000]], [100_000, 200_000]),  # 무음이 멀면 그대로
+    ],
+)
+def test_snap_split_points(silent_ranges, expected):
+    assert snap_split_points(300_000, 100_000, silent_ranges, 5_000) == expected
@@ -0,0 +1,43 @@
+# 06_Document_Loader/tests/test_hwp_batch_loader.py - HWPBatchLoader 워커 크래시 처리
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from hwp_batch_loader import HWPBatchLoader, HWPLoadResult
+
+
+def _crashing_load(path, chunk_size):
+    """이름에 crash가 들어간 파일에서 워커 프로세스를 강제 종료"""
+    if "crash" in path:
+        os._exit(1)
+    return HWPLoadResult(path, [Document(page_content=path, metadata={"source": path})])
+
+
+class CrashingLoader(HWPBatchLoader):
+    load_file = staticmethod(_crashing_load)
+
+
+def test_worker_crash_keeps_batch_running():
+    paths = ["a.hwp", "b.hwp", "crash.hwp", "c.hwp", "d.hwp", "e.hwp"]
+    loader = CrashingLoader(paths, max_workers=2, max_pending=1)
+
+    docs = loader.load()
+
+    assert [e.source for e in loader.errors] == ["crash.hwp"]
+    assert loader.errors[0].error_type == "BrokenProcessPool"
+    assert sorted(doc.page_content for doc in docs) == ["a.hwp", "b.hwp", "c.hwp", "d.hwp", "e.hwp"]
+
+
+def test_worker_crash_fails_only_the_crashing_files():
+    paths = ["a.hwp", "crash1.hwp", "b.hwp", "c.hwp", "d.hwp", "crash2.hwp", "e.hwp", "f.hwp"]
+    loader = CrashingLoader(paths, max_workers=2, max_pending=4)
+
+    docs = loader.load()
+
+    # 같이 실행 중이던 파일은 새 풀에서 다시 파싱되고, 워커를 죽인 파일만 실패
+    assert sorted(e.source for e in loader.errors) == ["crash1.hwp", "crash2.hwp"]
+    assert all(e.error_type == "BrokenProcessPool" for e in loader.errors)
+    assert sorted(doc.page_content for doc in docs) == ["a.hwp", "b.hwp", "c.hwp", "d.hwp", "e.hwp", "f.hwp"]
@@ -0,0 +1,185 @@
+# 10_Retriever/utils/bm25_index.py
+
+# ========================================
+# 🏆 BM25Index (역색인 기반 BM25 엔진)
+# CSR 포스팅 + 사전 계산된 문서 길이/IDF
+# ========================================
+
+import heapq
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class BM25Index:
+    """
+    CSR 형식 역색인 기반 BM25 (Okapi) 검색 엔진
+
+    Features:
+    - 색인 시점에 한 번만 토큰 → 포스팅 변환
+    - 문서 길이 / IDF 사전 계산
+    - 쿼리 토큰의 포스팅만 점수 계산 (전체 문서 스캔 X)
+    - heap 기반 상위 k개 선택
+    - rank_bm25.BM25Okapi 와 동일한 점수식
+
+    Examples:
+        >>> index = BM25Index.build([["금융", "보험"], ["저축", "상품"]])
+        >>> index.search(["금융", "보험"], k=1)     # [(문서 id, 점수)]
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lens: np.ndarray,
+        idf: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        초기화 (직접 호출보다 build() 사용 권장)
+
+        Args:
+            vocab: 토큰 → term id 매핑
+            indptr: term id 별 포스팅 시작 위치 (CSR, 길이 = 어휘수 + 1)
+            postings: 포스팅 문서 id 배열
+            term_freqs: 포스팅별 단어 빈도
+            doc_lens: 문서별 토큰 길이
+            idf: term id 별 IDF
+            k1: BM25 k1 파라미터
+            b: BM25 b 파라미터
+        """
+        self.vocab = vocab
+        self.indptr = indptr
+        self.postings = postings
+        self.term_freqs = term_freqs
+        self.doc_lens = doc_lens
+        self.idf = idf
+        self.k1 = k1
+        self.b = b
+
+        avgdl = float(doc_lens.mean()) if len(doc_lens) else 0.0
+        self.avgdl = avgdl
+
+        # 문서별 길이 정규화 항 사전 계산: k1 * (1 - b + b * |d| / avgdl)
+        if avgdl > 0:
+            self._norm = (k1 * (1 - b + b * doc_lens / avgdl)).astype(np.float32)
+        else:
+            self._norm = np.full(len(doc_lens), k1, dtype=np.float32)
+
+    @classmethod
+    def build(
+        cls,
+        tokenized_corpus: Sequence[Sequence[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "BM25Index":
+        """
+        토큰화된 코퍼스로부터 역색인 생성
+
+        Args:
+            tokenized_corpus: 문서별 토큰 리스트
+            k1: BM25 k1 파라미터
+            b: BM25 b 파라미터
+            epsilon: 음수 IDF 하한 계수 (평균 IDF * epsilon)
+
+        Returns:
+            BM25Index 인스턴스
+        """
+        vocab: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        freqs: List[int] = []
+        doc_lens = np.zeros(len(tokenized_corpus), dtype=np.float32)
+
+        # (term, doc, tf) 트리플 수집
+        for doc_id, tokens in enumerate(tokenized_corpus):
+            doc_lens[doc_id] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                term_id = vocab.setdefault(token, len(vocab))
+                term_ids.append(term_id)
+                doc_ids.append(doc_id)
+                freqs.append(tf)
+
+        term_arr = np.asarray(term_ids, dtype=np.int64)
+
+        # term id 기준 안정 정렬 → 같은 term 내에서 doc id 오름차순 유지
+        order = np.argsort(term_arr, kind="stable")
+        postings = np.asarray(doc_ids, dtype=np.int32)[order]
+        term_freqs = np.asarray(freqs, dtype=np.float32)[order]
+
+        # CSR indptr
+        df = np.bincount(term_arr, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=indptr[1:])
+
+        # IDF (rank_bm25.BM25Okapi 와 동일)
+        n_docs = len(tokenized_corpus)
+        idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+        if len(idf):
+            eps = epsilon * idf.mean()
+            idf = np.where(idf < 0, eps, idf)
+
+        return cls(
+            vocab=vocab,
+            indptr=indptr,
+            postings=postings,
+            term_freqs=term_freqs,
+            doc_lens=doc_lens,
+            idf=idf.astype(np.float32),
+            k1=k1,
+            b=b,
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_lens)
+
+    def search(
+        self,
+        query_tokens: Sequence[str],
+        k: int = 4
+    ) -> List[Tuple[int, float]]:
+        """
+        상위 k개 문서 검색
+
+        Args:
+            query_tokens: 토큰화된 쿼리
+            k: 반환할 문서 개수
+
+        Returns:
+            (문서 id, BM25 점수) 튜플 리스트 (점수 내림차순)
+        """
+        # 쿼리 term → 포스팅 구간 (중복 토큰은 BM25Okapi와 같이 중복 가산)
+        term_ids = [self.vocab[t] for t in query_tokens if t in self.vocab]
+        if not term_ids or k <= 0:
+            return []
+
+        doc_parts = []
+        score_parts = []
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.postings[start:end]
+            tf = self.term_freqs[start:end]
+
+            # idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * |d| / avgdl))
+            doc_parts.append(docs)
+            score_parts.append(
+                self.idf[term_id] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+            )
+
+        # 후보 문서별 점수 합산 (포스팅에 등장한 문서만)
+        all_docs = np.concatenate(doc_parts)
+        candidates, inverse = np.unique(all_docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        top = heapq.nlargest(
+            k,
+            zip(scores.tolist(), (-candidates).tolist())
+        )
+
+        # 동점이면 doc id 오름차순 (색인 순서 유지)
+        return [(-neg_id, score) for score, neg_id in top]
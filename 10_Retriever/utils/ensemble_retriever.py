@@ -5,13 +5,111 @@
 # RRF & CC 알고리즘 완전 구현
 # ========================================
 
+import asyncio
+import logging
+import math
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
-from typing import List, Optional, Dict, Tuple
+from typing import (
+    Hashable, List, NamedTuple, Optional, Dict, Tuple, Union, Protocol, runtime_checkable
+)
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStoreRetriever
 import numpy as np
 
 
+logger = logging.getLogger(__name__)
+
+# 검색기 하나의 결과: (Document 리스트, 원 점수 리스트 또는 None)
+ChildResult = Tuple[List[Document], Optional[List[float]]]
+
+
+class FusionCandidates(NamedTuple):
+    """
+    한 쿼리에 대한 검색기별 후보 (결합 전)
+    
+    같은 후보로 RRF / CC, 여러 가중치 / c 값을 검색 없이 다시 결합할 수 있다.
+    """
+    query: str                              # 검색 쿼리
+    docs: List[List[Document]]              # 검색기 순서대로의 Document 리스트
+    scores: List[Optional[List[float]]]     # 검색기별 원 점수 (없으면 None)
+    complete: bool = True                   # 제외된(시간 초과/실패) 검색기가 없으면 True
+
+
+class CandidateCache:
+    """
+    쿼리별 후보 캐시 (LRU)
+    
+    키는 (쿼리, 검색기 목록)이므로 같은 검색기를 쓰는 여러 앙상블
+    (예: RRF 앙상블과 CC 앙상블)이 하나의 캐시를 공유할 수 있다.
+    제외된 검색기가 있는 부분 결과는 저장하지 않는다.
+    
+    Examples:
+        >>> cache = CandidateCache()
+        >>> rrf = CustomEnsembleRetriever([faiss, bm25], candidate_cache=cache)
+        >>> cc = CustomEnsembleRetriever([faiss, bm25], method=EnsembleMethod.CC,
+        ...                              candidate_cache=cache)
+        >>> rrf.invoke("금융 상품"); cc.invoke("금융 상품")   # 검색은 한 번만
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        """
+        초기화
+        
+        Args:
+            maxsize: 보관할 최대 쿼리 수
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, FusionCandidates]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[FusionCandidates]:
+        with self._lock:
+            candidates = self._entries.get(key)
+            if candidates is not None:
+                self._entries.move_to_end(key)
+            return candidates
+    
+    def put(self, key: Hashable, candidates: FusionCandidates) -> None:
+        if not candidates.complete or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = candidates
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """캐시 비우기 (색인이 바뀌었을 때)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@runtime_checkable
+class ScoredRetriever(Protocol):
+    """
+    점수를 함께 돌려주는 검색기 프로토콜
+    
+    CustomEnsembleRetriever는 이 메서드가 있으면 invoke 대신 호출하고,
+    반환된 점수(높을수록 관련)를 CC 결합에 그대로 사용한다.
+    """
+    
+    def search_with_scores(
+        self,
+        query: str,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        ...
+
+
 class EnsembleMethod(Enum):
     """앙상블 방법 Enum"""
     RRF = "rrf"  # Reciprocal Rank Fusion
@@ -27,6 +125,10 @@ class CustomEnsembleRetriever(BaseRetriever):
     - CC (Convex Combination): 점수 기반 가중 결합
     - 가중치 조정 가능
     - BaseRetriever 상속으로 LCEL 호환
+    - 검색기 병렬 실행 (스레드 풀 / asyncio.gather)
+    - 검색기별 timeout: 느린 검색기는 빈 결과로 처리 (부분 결과로 결합)
+    - 점수 인식 검색: ScoredRetriever.search_with_scores / FAISS 관련도 점수를 CC에 사용
+    - 후보 재사용: retrieve_candidates() 한 번 → fuse()로 방법 / 가중치 / c 바꿔 재결합
     
     Examples:
         >>> # RRF 방식
@@ -41,6 +143,17 @@ class CustomEnsembleRetriever(BaseRetriever):
         ...     method=EnsembleMethod.CC,
         ...     weights=[0.7, 0.3]
         ... )
+        
+        >>> # 원격 검색기만 0.5초 제한
+        >>> ensemble = CustomEnsembleRetriever(
+        ...     retrievers=[faiss, bm25, remote],
+        ...     timeout=[None, None, 0.5]
+        ... )
+        
+        >>> # 한 번 검색한 후보로 RRF / CC 모두 계산
+        >>> candidates = ensemble.retrieve_candidates("금융 상품")
+        >>> rrf = ensemble.fuse(candidates, method=EnsembleMethod.RRF)
+        >>> cc = ensemble.fuse(candidates, method=EnsembleMethod.CC, weights=[0.7, 0.3])
     """
     
     # ========================================
@@ -57,6 +170,14 @@ class CustomEnsembleRetriever(BaseRetriever):
     _weights: Optional[List[float]] = None
     _k: int = 5
     _c: int = 60  # RRF constant
+    _timeouts: List[Optional[float]] = []
+    _max_workers: Optional[int] = None
+    _max_abandoned: int = 2
+    _abandoned: List[int] = []
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock: Optional[threading.Lock] = None
+    _id_key: Optional[str] = None
+    _candidate_cache: Optional[CandidateCache] = None
     
     def __init__(
         self,
@@ -65,6 +186,11 @@ class CustomEnsembleRetriever(BaseRetriever):
         weights: Optional[List[float]] = None,
         k: int = 5,
         c: int = 60,
+        timeout: Union[None, float, List[Optional[float]]] = None,
+        max_workers: Optional[int] = None,
+        max_abandoned: int = 2,
+        id_key: Optional[str] = None,
+        candidate_cache: Optional[CandidateCache] = None,
         **kwargs
     ):
         """
@@ -76,6 +202,14 @@ class CustomEnsembleRetriever(BaseRetriever):
             weights: 각 검색기의 가중치 (CC에서만 사용)
             k: 반환할 문서 개수
             c: RRF 상수 (기본 60)
+            timeout: 검색기별 제한 시간(초). 하나의 값이면 전체 공통,
+                리스트면 검색기별 (None = 제한 없음)
+            max_workers: 동시에 실행할 검색기 수 (기본: 검색기 개수)
+                제한 시간을 넘긴 검색기는 이 수에 포함되지 않음
+            max_abandoned: 검색기별로 제한 시간을 넘기고도 아직 실행 중인 호출의 최대 수.
+                이만큼 쌓이면 그 검색기는 호출 하나가 끝날 때까지 바로 제외 (스레드 누적 방지)
+            id_key: 문서 식별에 쓸 메타데이터 키 (None이면 page_content)
+            candidate_cache: 쿼리별 후보 캐시 (여러 앙상블이 공유 가능, None이면 캐시 안 함)
         """
         super().__init__(**kwargs)
         
@@ -83,20 +217,41 @@ class CustomEnsembleRetriever(BaseRetriever):
         self._method = method
         self._k = k
         self._c = c
+        self._max_workers = max_workers or len(retrievers)
+        self._max_abandoned = max_abandoned
+        self._abandoned = [0] * len(retrievers)
+        self._executor_lock = threading.Lock()
+        self._id_key = id_key
+        self._candidate_cache = candidate_cache
         
-        # 가중치 설정
-        if weights is None:
-            # 균등 가중치
-            self._weights = [1.0 / len(retrievers)] * len(retrievers)
-        else:
-            if len(weights) != len(retrievers):
+        # timeout 설정
+        if isinstance(timeout, (list, tuple)):
+            if len(timeout) != len(retrievers):
                 raise ValueError(
-                    f"weights 길이({len(weights)})가 "
+                    f"timeout 길이({len(timeout)})가 "
                     f"retrievers 길이({len(retrievers)})와 다릅니다."
                 )
-            # 정규화
-            total = sum(weights)
-            self._weights = [w / total for w in weights]
+            self._timeouts = list(timeout)
+        else:
+            self._timeouts = [timeout] * len(retrievers)
+        
+        # 가중치 설정
+        self._weights = self._normalize_weights(weights)
+    
+    def _normalize_weights(self, weights: Optional[List[float]]) -> List[float]:
+        """가중치 검증 + 합이 1이 되도록 정규화 (None이면 균등)"""
+        n = len(self._retrievers)
+        if weights is None:
+            # 균등 가중치
+            return [1.0 / n] * n
+        if len(weights) != n:
+            raise ValueError(
+                f"weights 길이({len(weights)})가 "
+                f"retrievers 길이({n})와 다릅니다."
+            )
+        # 정규화
+        total = sum(weights)
+        return [w / total for w in weights]
     
     # ========================================
     # Property
@@ -138,28 +293,441 @@ class CustomEnsembleRetriever(BaseRetriever):
         Returns:
             앙상블된 Document 리스트
         """
-        # 각 검색기에서 문서 검색
-        retriever_docs = []
-        for retriever in self._retrievers:
-            docs = retriever.invoke(query)
-            retriever_docs.append(docs)
-        
-        # 앙상블 방법에 따라 결합
-        if self._method == EnsembleMethod.RRF:
-            return self._rrf_fusion(retriever_docs)
-        elif self._method == EnsembleMethod.CC:
-            return self._cc_fusion(retriever_docs, query)
+        return [doc for doc, _ in self.search_with_scores(query)]
+    
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager=None
+    ) -> List[Document]:
+        """
+        앙상블 검색 실행 (비동기)
+        
+        Args:
+            query: 검색 쿼리
+            run_manager: 실행 관리자
+            
+        Returns:
+            앙상블된 Document 리스트
+        """
+        candidates = await self.aretrieve_candidates(query)
+        return [doc for doc, _ in self.fuse(candidates)]
+    
+    # ========================================
+    # 후보 검색 / 결합 (검색 1회 → 결합 여러 번)
+    # ========================================
+    
+    def search_with_scores(
+        self,
+        query: str,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        앙상블 점수와 함께 상위 k개 반환 (ScoredRetriever 프로토콜)
+        
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 개수 (None이면 self.k)
+            
+        Returns:
+            (Document, score) 튜플 리스트 (점수 내림차순)
+        """
+        return self.fuse(self.retrieve_candidates(query), k=k)
+    
+    def retrieve_candidates(self, query: str) -> FusionCandidates:
+        """
+        모든 검색기의 후보 검색 (candidate_cache가 있으면 캐시 사용)
+        
+        Args:
+            query: 검색 쿼리
+            
+        Returns:
+            FusionCandidates (fuse()에 그대로 전달)
+        """
+        key = self._cache_key(query)
+        if self._candidate_cache is not None:
+            cached = self._candidate_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        candidates = self._retrieve_all(query)
+        if self._candidate_cache is not None:
+            self._candidate_cache.put(key, candidates)
+        return candidates
+    
+    async def aretrieve_candidates(self, query: str) -> FusionCandidates:
+        """retrieve_candidates의 비동기 버전"""
+        key = self._cache_key(query)
+        if self._candidate_cache is not None:
+            cached = self._candidate_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        candidates = await self._aretrieve_all(query)
+        if self._candidate_cache is not None:
+            self._candidate_cache.put(key, candidates)
+        return candidates
+    
+    def _cache_key(self, query: str) -> Hashable:
+        """(쿼리, 검색기 목록) → 캐시 키"""
+        return query, tuple(id(r) for r in self._retrievers)
+    
+    def fuse(
+        self,
+        candidates: FusionCandidates,
+        method: Optional[EnsembleMethod] = None,
+        weights: Optional[List[float]] = None,
+        c: Optional[float] = None,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        검색된 후보를 결합 (검색기 재호출 없음)
+        
+        인자를 생략하면 인스턴스 설정(method / weights / c / k)을 사용한다.
+        
+        Args:
+            candidates: retrieve_candidates() 결과
+            method: 앙상블 방법
+            weights: CC 가중치 (정규화됨)
+            c: RRF 상수
+            k: 반환할 문서 개수
+            
+        Returns:
+            (Document, score) 튜플 리스트 (점수 내림차순)
+        """
+        method = method or self._method
+        if method == EnsembleMethod.RRF:
+            return self._rrf_scores(candidates.docs, c=c, k=k)
+        elif method == EnsembleMethod.CC:
+            return self._cc_scores(
+                candidates.docs,
+                candidates.query,
+                candidates.scores,
+                weights=None if weights is None else self._normalize_weights(weights),
+                k=k
+            )
+        else:
+            raise ValueError(f"알 수 없는 method: {method}")
+    
+    # ========================================
+    # 병렬 검색 (timeout / 부분 결과)
+    # ========================================
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        검색용 스레드 풀 (처음 사용할 때 한 번만 생성, 이후 재사용)
+        
+        크기 = max_workers + 검색기 수 * max_abandoned
+        → 버려진 호출이 한도까지 쌓여도 실행 중인 검색의 자리는 남는다.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers + len(self._retrievers) * self._max_abandoned,
+                    thread_name_prefix="ensemble-retriever"
+                )
+            return self._executor
+    
+    def _circuit_open(self, idx: int) -> bool:
+        """버려진 호출이 max_abandoned개 쌓인 검색기인지 (그렇다면 이번 검색에서 제외)"""
+        with self._executor_lock:
+            tripped = self._abandoned[idx] >= self._max_abandoned
+        if tripped:
+            logger.warning(
+                "retriever[%d] 제한 시간을 넘긴 호출 %d개가 아직 실행 중 → 제외",
+                idx, self._max_abandoned
+            )
+        return tripped
+    
+    def _abandon(self, idx: int, future: Future) -> None:
+        """
+        제한 시간을 넘긴 호출을 버림 (스레드는 멈출 수 없으므로 끝날 때까지 개수만 셈)
+        """
+        def release(_):
+            with self._executor_lock:
+                self._abandoned[idx] -= 1
+        
+        with self._executor_lock:
+            self._abandoned[idx] += 1
+        future.add_done_callback(release)   # 이미 끝났으면 바로 호출됨
+    
+    @staticmethod
+    def _search_child(retriever, query: str) -> ChildResult:
+        """
+        검색기 하나 실행 (가능하면 점수 포함)
+        
+        1. ScoredRetriever → search_with_scores
+        2. similarity 타입 VectorStoreRetriever (FAISS 등) → 관련도 점수 검색
+           (관련도 점수를 지원하지 않는 벡터스토어는 3번으로)
+        3. 그 외 → invoke (점수 없음)
+        """
+        if isinstance(retriever, ScoredRetriever):
+            pairs = retriever.search_with_scores(query)
+            return [doc for doc, _ in pairs], [score for _, score in pairs]
+        
+        if (
+            isinstance(retriever, VectorStoreRetriever)
+            and retriever.search_type == "similarity"
+        ):
+            try:
+                pairs = retriever.vectorstore.similarity_search_with_relevance_scores(
+                    query, **retriever.search_kwargs
+                )
+                return [doc for doc, _ in pairs], [score for _, score in pairs]
+            except NotImplementedError:
+                pass
+        
+        return retriever.invoke(query), None
+    
+    async def _asearch_child(self, idx: int, retriever, query: str) -> Optional[ChildResult]:
+        """_search_child의 비동기 버전 (제외된 검색기는 None)"""
+        if isinstance(retriever, VectorStoreRetriever) and retriever.search_type == "similarity":
+            try:
+                pairs = await retriever.vectorstore.asimilarity_search_with_relevance_scores(
+                    query, **retriever.search_kwargs
+                )
+                return [doc for doc, _ in pairs], [score for _, score in pairs]
+            except NotImplementedError:
+                return await retriever.ainvoke(query), None
+        
+        if not isinstance(retriever, ScoredRetriever) and hasattr(retriever, "ainvoke"):
+            return await retriever.ainvoke(query), None
+        
+        # 동기 전용 검색기는 스레드 풀에서 실행 (취소되면 버린 호출로 기록)
+        if self._circuit_open(idx):
+            return None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def settle(result, error):
+            if not future.done():
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+        
+        def run():
+            try:
+                result, error = self._search_child(retriever, query), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 닫힘
+        
+        call = self._get_executor().submit(run)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._abandon(idx, call)
+            raise
+    
+    def _retrieve_all(self, query: str) -> FusionCandidates:
+        """
+        모든 검색기를 스레드 풀에서 동시에 실행 (최대 max_workers개)
+        
+        제한 시간을 넘기거나 실패한 검색기는 빈 리스트로 처리한다.
+        (모든 검색기가 실패하면 마지막 예외를 다시 발생)
+        
+        Args:
+            query: 검색 쿼리
+            
+        Returns:
+            FusionCandidates (검색기 순서대로의 Document / 점수)
+        """
+        n = len(self._retrievers)
+        done: "queue.Queue" = queue.Queue()
+        
+        def run(idx: int, retriever) -> None:
+            try:
+                done.put((idx, self._search_child(retriever, query), None))
+            except Exception as e:
+                done.put((idx, None, e))
+        
+        pending = deque(range(n))
+        deadlines: Dict[int, float] = {}  # 실행 중인 검색기 → 제한 시각
+        calls: Dict[int, Future] = {}
+        results: List[Optional[ChildResult]] = [None] * n
+        errors: List[BaseException] = []
+        
+        while pending or deadlines:
+            # 빈 자리만큼 시작 (제한 시간은 실제로 시작한 시각부터)
+            while pending and len(deadlines) < self._max_workers:
+                idx = pending.popleft()
+                if self._circuit_open(idx):
+                    continue
+                timeout = self._timeouts[idx]
+                deadlines[idx] = math.inf if timeout is None else time.monotonic() + timeout
+                calls[idx] = self._get_executor().submit(run, idx, self._retrievers[idx])
+            if not deadlines:
+                break
+            
+            wait = min(deadlines.values()) - time.monotonic()
+            try:
+                idx, result, error = done.get(timeout=None if math.isinf(wait) else max(0.0, wait))
+            except queue.Empty:
+                # 제한 시간 초과 → 결과를 버리고 자리 반납
+                now = time.monotonic()
+                for idx in [i for i, deadline in deadlines.items() if deadline <= now]:
+                    del deadlines[idx]
+                    self._abandon(idx, calls[idx])
+                    logger.warning(
+                        "retriever[%d] 제한 시간(%.3fs) 초과 → 제외", idx, self._timeouts[idx]
+                    )
+                continue
+            
+            if idx not in deadlines:
+                continue  # 이미 제외된 검색기의 늦은 결과
+            del deadlines[idx]
+            if error is not None:
+                logger.warning("retriever[%d] 검색 실패 → 제외: %s", idx, error)
+                errors.append(error)
+            else:
+                results[idx] = result
+        
+        return self._partial_results(query, results, errors)
+    
+    async def _aretrieve_all(self, query: str) -> FusionCandidates:
+        """
+        모든 검색기를 asyncio.gather로 동시에 실행 (_retrieve_all의 비동기 버전)
+        
+        Args:
+            query: 검색 쿼리
+            
+        Returns:
+            FusionCandidates (검색기 순서대로의 Document / 점수)
+        """
+        outcomes = await asyncio.gather(
+            *(
+                asyncio.wait_for(self._asearch_child(idx, r, query), timeout=t)
+                for idx, (r, t) in enumerate(zip(self._retrievers, self._timeouts))
+            ),
+            return_exceptions=True
+        )
+        
+        results: List[Optional[ChildResult]] = []
+        errors: List[BaseException] = []
+        for idx, outcome in enumerate(outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.warning(
+                    "retriever[%d] 제한 시간(%.3fs) 초과 → 제외", idx, self._timeouts[idx]
+                )
+                results.append(None)
+            elif isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome  # CancelledError 등은 그대로 전파
+                logger.warning("retriever[%d] 검색 실패 → 제외: %s", idx, outcome)
+                errors.append(outcome)
+                results.append(None)
+            else:
+                results.append(outcome)
+        
+        return self._partial_results(query, results, errors)
+    
+    @staticmethod
+    def _partial_results(
+        query: str,
+        results: List[Optional[ChildResult]],
+        errors: List[BaseException]
+    ) -> FusionCandidates:
+        """제외된 검색기는 빈 리스트로 (전부 실패면 예외)"""
+        if errors and all(r is None for r in results):
+            raise errors[-1]
+        complete = all(r is not None for r in results)
+        results = [r if r is not None else ([], None) for r in results]
+        return FusionCandidates(
+            query=query,
+            docs=[docs for docs, _ in results],
+            scores=[scores for _, scores in results],
+            complete=complete
+        )
+    
+    # ========================================
+    # 융합 코어 (문서 id → 배열 슬롯)
+    # ========================================
+    
+    def _doc_key(self, doc: Document) -> Hashable:
+        """
+        문서 식별자
+        
+        id_key가 지정되어 있고 메타데이터에 값이 있으면 ("id", 값),
+        아니면 ("content", page_content) (같은 내용 = 같은 문서)
+        
+        page_content 자체를 키로 쓰므로 해시가 충돌해도 dict가 내용을 비교하고,
+        네임스페이스가 달라 id 값과 본문이 같은 키가 되지 않는다.
+        """
+        if self._id_key is not None:
+            doc_id = doc.metadata.get(self._id_key)
+            if doc_id is not None:
+                return ("id", doc_id)
+        return ("content", doc.page_content)
+    
+    def _fuse_ranked(
+        self,
+        retriever_docs: List[List[Document]],
+        contributions: List[np.ndarray],
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        검색기별 점수 기여도를 문서 단위로 합산 후 상위 k개 선택
+        
+        Args:
+            retriever_docs: 각 검색기의 Document 리스트
+            contributions: 각 검색기 결과 순서대로의 점수 기여도 배열
+            k: 반환할 문서 개수 (None이면 self.k)
+            
+        Returns:
+            (Document, score) 튜플 리스트 (점수 내림차순)
+        """
+        # 문서 id → 슬롯 (처음 등장한 Document를 대표로 사용)
+        slot_of: Dict[Hashable, int] = {}
+        unique_docs: List[Document] = []
+        slot_parts = []
+        for docs in retriever_docs:
+            slots = np.empty(len(docs), dtype=np.intp)
+            for i, doc in enumerate(docs):
+                key = self._doc_key(doc)
+                slot = slot_of.get(key)
+                if slot is None:
+                    slot = slot_of[key] = len(unique_docs)
+                    unique_docs.append(doc)
+                slots[i] = slot
+            slot_parts.append(slots)
+        
+        n = len(unique_docs)
+        if n == 0:
+            return []
+        
+        # 슬롯별 점수 누적
+        totals = np.zeros(n, dtype=np.float64)
+        for slots, contrib in zip(slot_parts, contributions):
+            np.add.at(totals, slots, contrib)
+        
+        # 상위 k개만 부분 선택 후 정렬 (동점은 먼저 등장한 문서 우선)
+        k = min(self._k if k is None else k, n)
+        if k <= 0:
+            return []
+        if k == n:
+            top = np.arange(n)
         else:
-            raise ValueError(f"알 수 없는 method: {self._method}")
+            kth = totals[np.argpartition(-totals, k - 1)[k - 1]]
+            top = np.flatnonzero(totals >= kth)   # k번째와 동점인 문서까지 포함
+        top = top[np.lexsort((top, -totals[top]))][:k]
+        
+        return [(unique_docs[i], float(totals[i])) for i in top.tolist()]
     
     # ========================================
     # RRF 알고리즘 구현
     # ========================================
     
-    def _rrf_fusion(
+    def _rrf_scores(
         self,
-        retriever_docs: List[List[Document]]
-    ) -> List[Document]:
+        retriever_docs: List[List[Document]],
+        c: Optional[float] = None,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
         """
         Reciprocal Rank Fusion (RRF)
         
@@ -169,48 +737,33 @@ class CustomEnsembleRetriever(BaseRetriever):
         
         Args:
             retriever_docs: 각 검색기의 Document 리스트
+            c: RRF 상수 (None이면 self._c)
+            k: 반환할 문서 개수 (None이면 self.k)
             
         Returns:
-            RRF로 결합된 Document 리스트
-        """
-        # 문서별 RRF 점수 계산
-        doc_scores: Dict[str, Tuple[Document, float]] = {}
-        
-        for retriever_idx, docs in enumerate(retriever_docs):
-            for rank, doc in enumerate(docs, start=1):
-                # 문서 식별자 (content로 구분)
-                doc_id = doc.page_content
-                
-                # RRF 점수 계산: 1 / (c + rank)
-                rrf_score = 1.0 / (self._c + rank)
-                
-                if doc_id in doc_scores:
-                    # 기존 점수에 추가
-                    existing_doc, existing_score = doc_scores[doc_id]
-                    doc_scores[doc_id] = (existing_doc, existing_score + rrf_score)
-                else:
-                    # 새 문서 추가
-                    doc_scores[doc_id] = (doc, rrf_score)
-        
-        # 점수 기준 정렬
-        sorted_docs = sorted(
-            doc_scores.values(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+            RRF 점수와 함께 상위 k개 (Document, score) 리스트
+        """
+        c = self._c if c is None else c
         
-        # 상위 k개 반환
-        return [doc for doc, _ in sorted_docs[:self._k]]
+        # RRF 점수 계산: 1 / (c + rank)
+        contributions = [
+            1.0 / (c + np.arange(1, len(docs) + 1, dtype=np.float64))
+            for docs in retriever_docs
+        ]
+        return self._fuse_ranked(retriever_docs, contributions, k=k)
     
     # ========================================
     # CC 알고리즘 구현
     # ========================================
     
-    def _cc_fusion(
+    def _cc_scores(
         self,
         retriever_docs: List[List[Document]],
-        query: str
-    ) -> List[Document]:
+        query: str,
+        retriever_scores: Optional[List[Optional[List[float]]]] = None,
+        weights: Optional[List[float]] = None,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
         """
         Convex Combination (CC)
         
@@ -221,43 +774,25 @@ class CustomEnsembleRetriever(BaseRetriever):
         Args:
             retriever_docs: 각 검색기의 Document 리스트
             query: 검색 쿼리
+            retriever_scores: 각 검색기의 원 점수 (없으면 None)
+            weights: 정규화된 가중치 (None이면 self._weights)
+            k: 반환할 문서 개수 (None이면 self.k)
             
         Returns:
-            CC로 결합된 Document 리스트
+            CC 점수와 함께 상위 k개 (Document, score) 리스트
         """
-        # 문서별 CC 점수 계산
-        doc_scores: Dict[str, Tuple[Document, float]] = {}
-        
-        for retriever_idx, docs in enumerate(retriever_docs):
-            weight = self._weights[retriever_idx]
-            
-            # 각 검색기의 점수를 정규화 (0~1)
-            scores = self._normalize_scores(docs, query)
-            
-            for doc, score in zip(docs, scores):
-                doc_id = doc.page_content
-                
-                # CC 점수 계산: w_i * score_i
-                weighted_score = weight * score
-                
-                if doc_id in doc_scores:
-                    existing_doc, existing_score = doc_scores[doc_id]
-                    doc_scores[doc_id] = (
-                        existing_doc, 
-                        existing_score + weighted_score
-                    )
-                else:
-                    doc_scores[doc_id] = (doc, weighted_score)
-        
-        # 점수 기준 정렬
-        sorted_docs = sorted(
-            doc_scores.values(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        weights = self._weights if weights is None else weights
+        if retriever_scores is None:
+            retriever_scores = [None] * len(retriever_docs)
         
-        # 상위 k개 반환
-        return [doc for doc, _ in sorted_docs[:self._k]]
+        # CC 점수 계산: w_i * 정규화된 score_i (0~1)
+        contributions = [
+            weight * self._normalize_scores(docs, query, scores)
+            for weight, docs, scores in zip(
+                weights, retriever_docs, retriever_scores
+            )
+        ]
+        return self._fuse_ranked(retriever_docs, contributions, k=k)
     
     # ========================================
     # 점수 정규화
@@ -266,48 +801,50 @@ class CustomEnsembleRetriever(BaseRetriever):
     def _normalize_scores(
         self,
         docs: List[Document],
-        query: str
-    ) -> List[float]:
+        query: str,
+        raw_scores: Optional[List[float]] = None
+    ) -> np.ndarray:
         """
         문서 점수를 0~1로 정규화
         
         Args:
             docs: Document 리스트
             query: 검색 쿼리
+            raw_scores: 검색기가 직접 반환한 점수 (ScoredRetriever / FAISS)
             
         Returns:
-            정규화된 점수 리스트
+            정규화된 점수 배열
         """
-        # 메타데이터에 score가 있으면 사용
-        scores = []
-        for doc in docs:
-            if 'score' in doc.metadata:
-                scores.append(doc.metadata['score'])
-            else:
-                # score가 없으면 순위 기반으로 점수 생성
-                # 1위 = 1.0, 2위 = 0.9, 3위 = 0.8, ...
-                rank = len(scores) + 1
-                score = 1.0 - (rank - 1) * 0.1
-                scores.append(max(score, 0.1))  # 최소 0.1
+        if not docs:
+            return np.zeros(0, dtype=np.float64)
         
-        # Min-Max 정규화
-        if not scores:
-            return []
+        if raw_scores is not None:
+            # 검색기가 돌려준 실제 점수 사용
+            scores = np.asarray(raw_scores, dtype=np.float64)
+        else:
+            # 메타데이터에 score가 있으면 사용
+            # score가 없으면 순위 기반으로 점수 생성
+            # 1위 = 1.0, 2위 = 0.9, 3위 = 0.8, ... (최소 0.1)
+            scores = np.fromiter(
+                (
+                    doc.metadata['score'] if 'score' in doc.metadata
+                    else max(1.0 - rank * 0.1, 0.1)
+                    for rank, doc in enumerate(docs)
+                ),
+                dtype=np.float64,
+                count=len(docs)
+            )
         
-        min_score = min(scores)
-        max_score = max(scores)
+        # Min-Max 정규화
+        min_score = scores.min()
+        max_score = scores.max()
         
         if max_score == min_score:
             # 모든 점수가 같으면 균등
-            return [1.0 / len(scores)] * len(scores)
+            return np.full(len(scores), 1.0 / len(scores))
         
         # 0~1 범위로 정규화
-        normalized = [
-            (score - min_score) / (max_score - min_score)
-            for score in scores
-        ]
-        
-        return normalized
+        return (scores - min_score) / (max_score - min_score)
     
     # ========================================
     # 추가 유틸리티
@@ -323,52 +860,7 @@ class CustomEnsembleRetriever(BaseRetriever):
         Returns:
             (Document, score) 튜플 리스트
         """
-        # 각 검색기에서 문서 검색
-        retriever_docs = []
-        for retriever in self._retrievers:
-            docs = retriever.invoke(query)
-            retriever_docs.append(docs)
-        
-        # 점수 계산
-        doc_scores: Dict[str, Tuple[Document, float]] = {}
-        
-        if self._method == EnsembleMethod.RRF:
-            # RRF 점수
-            for retriever_idx, docs in enumerate(retriever_docs):
-                for rank, doc in enumerate(docs, start=1):
-                    doc_id = doc.page_content
-                    rrf_score = 1.0 / (self._c + rank)
-                    
-                    if doc_id in doc_scores:
-                        existing_doc, existing_score = doc_scores[doc_id]
-                        doc_scores[doc_id] = (existing_doc, existing_score + rrf_score)
-                    else:
-                        doc_scores[doc_id] = (doc, rrf_score)
-        
-        elif self._method == EnsembleMethod.CC:
-            # CC 점수
-            for retriever_idx, docs in enumerate(retriever_docs):
-                weight = self._weights[retriever_idx]
-                scores = self._normalize_scores(docs, query)
-                
-                for doc, score in zip(docs, scores):
-                    doc_id = doc.page_content
-                    weighted_score = weight * score
-                    
-                    if doc_id in doc_scores:
-                        existing_doc, existing_score = doc_scores[doc_id]
-                        doc_scores[doc_id] = (existing_doc, existing_score + weighted_score)
-                    else:
-                        doc_scores[doc_id] = (doc, weighted_score)
-        
-        # 점수 기준 정렬
-        sorted_docs = sorted(
-            doc_scores.values(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
-        return sorted_docs[:self._k]
+        return self.search_with_scores(query)
 
 
 # ========================================
@@ -411,23 +903,14 @@ def compare_methods(
     print(f"🔍 검색어: {query}")
     print(f"{'='*60}")
     
-    # RRF
-    rrf_ensemble = CustomEnsembleRetriever(
-        retrievers=retrievers,
-        method=EnsembleMethod.RRF,
-        k=k
-    )
-    rrf_results = rrf_ensemble.invoke(query)
-    rrf_scores = rrf_ensemble.get_scores(query)
-    
-    # CC
-    cc_ensemble = CustomEnsembleRetriever(
-        retrievers=retrievers,
-        method=EnsembleMethod.CC,
-        k=k
-    )
-    cc_results = cc_ensemble.invoke(query)
-    cc_scores = cc_ensemble.get_scores(query)
+    # 검색은 한 번만 → 같은 후보로 RRF / CC 결합
+    ensemble = CustomEnsembleRetriever(retrievers=retrievers, k=k)
+    candidates = ensemble.retrieve_candidates(query)
+    
+    rrf_scores = ensemble.fuse(candidates, method=EnsembleMethod.RRF)
+    cc_scores = ensemble.fuse(candidates, method=EnsembleMethod.CC)
+    rrf_results = [doc for doc, _ in rrf_scores]
+    cc_results = [doc for doc, _ in cc_scores]
     
     # 출력
     print("\n" + "="*60)
@@ -0,0 +1,304 @@
+# 10_Retriever/utils/fusion_sweep.py
+
+# ========================================
+# 🏆 FusionSweep (앙상블 파라미터 오프라인 탐색)
+# 쿼리당 검색 1회 → 후보 행렬 캐시 → RRF c / CC 가중치 격자 일괄 평가
+# ========================================
+
+import itertools
+from typing import Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from utils.ensemble_retriever import CustomEnsembleRetriever, EnsembleMethod
+except ImportError:
+    from ensemble_retriever import CustomEnsembleRetriever, EnsembleMethod
+
+
+# 라벨 데이터: {쿼리: 정답 문서 id들} 또는 [(쿼리, 정답 문서 id들), ...]
+LabeledQueries = Union[Mapping[str, Iterable[Hashable]], Sequence[Tuple[str, Iterable[Hashable]]]]
+
+
+class SweepResult(NamedTuple):
+    """파라미터 설정 하나의 평가 결과 (쿼리 평균)"""
+    method: EnsembleMethod
+    c: Optional[float]                      # RRF 상수 (CC면 None)
+    weights: Optional[Tuple[float, ...]]    # CC 가중치 (RRF면 None)
+    recall: float                           # recall@k
+    mrr: float                              # MRR@k
+    ndcg: float                             # nDCG@k
+
+
+def weight_grid(n_retrievers: int, step: float = 0.1) -> List[Tuple[float, ...]]:
+    """
+    합이 1인 가중치 격자 생성
+
+    Args:
+        n_retrievers: 검색기 개수
+        step: 격자 간격
+
+    Returns:
+        가중치 튜플 리스트 (각 가중치 > 0)
+
+    Examples:
+        >>> weight_grid(2, step=0.25)
+        [(0.25, 0.75), (0.5, 0.5), (0.75, 0.25)]
+    """
+    units = int(round(1 / step))
+    grid = []
+    for parts in itertools.product(range(1, units), repeat=n_retrievers - 1):
+        last = units - sum(parts)
+        if last >= 1:
+            grid.append(tuple(p / units for p in parts) + (last / units,))
+    return grid
+
+
+class FusionSweep:
+    """
+    CustomEnsembleRetriever 결합 파라미터 오프라인 탐색
+
+    Features:
+    - 라벨 쿼리마다 검색기 호출은 정확히 1회 (retrieve_candidates)
+    - 후보를 (쿼리, 검색기, 순위) 패딩 배열로 한 번만 변환
+    - RRF c 값 / CC 가중치 격자를 bincount 한 번으로 일괄 결합
+    - recall@k / MRR / nDCG 를 설정별로 계산
+
+    정답 문서 id는 ensemble의 id_key 메타데이터 값 (없으면 page_content).
+
+    Examples:
+        >>> sweep = FusionSweep(ensemble, {"금융 상품": ["doc-3", "doc-7"]}, k=5)
+        >>> results = sweep.run(cs=[10, 60], weights=weight_grid(2, 0.1))
+        >>> print_sweep(results)
+    """
+
+    def __init__(
+        self,
+        ensemble: CustomEnsembleRetriever,
+        labeled_queries: LabeledQueries,
+        k: Optional[int] = None
+    ):
+        """
+        초기화 (모든 라벨 쿼리 검색을 여기서 한 번에 수행)
+
+        Args:
+            ensemble: 평가할 앙상블 검색기 (검색기 / 정규화 / 문서 식별 규칙 사용)
+            labeled_queries: 쿼리별 정답 문서 id
+            k: 평가 기준 상위 k (None이면 ensemble.k)
+        """
+        self.ensemble = ensemble
+        self.k = ensemble.k if k is None else k
+
+        if isinstance(labeled_queries, Mapping):
+            labeled_queries = list(labeled_queries.items())
+        self.queries = [query for query, _ in labeled_queries]
+        relevant = [set(ids) for _, ids in labeled_queries]
+
+        # 검색 1회 / 쿼리
+        candidates = [ensemble.retrieve_candidates(query) for query in self.queries]
+        self._build_matrices(candidates, relevant)
+
+    # ========================================
+    # 후보 → 패딩 배열
+    # ========================================
+
+    def _build_matrices(self, candidates, relevant: List[set]) -> None:
+        """
+        후보를 배열로 변환
+
+        - slots  (Q, R, M): 쿼리 내 문서 슬롯 (패딩 = 0, mask로 제외)
+        - ranks  (Q, R, M): 1부터 시작하는 순위
+        - norm   (Q, R, M): CC용 정규화 점수
+        - mask   (Q, R, M): 실제 후보 여부
+        - rel    (Q, S)   : 슬롯별 정답 여부
+        """
+        ensemble = self.ensemble
+        n_queries = len(candidates)
+        n_retrievers = len(candidates[0].docs) if candidates else 0
+        self.n_retrievers = n_retrievers
+        depth = max(
+            (len(docs) for cand in candidates for docs in cand.docs), default=0
+        )
+
+        slot_rows = []
+        self._n_slots = np.zeros(n_queries, dtype=np.int64)
+        self.slots = np.zeros((n_queries, n_retrievers, depth), dtype=np.int64)
+        self.norm = np.zeros((n_queries, n_retrievers, depth), dtype=np.float64)
+        self.mask = np.zeros((n_queries, n_retrievers, depth), dtype=bool)
+        self.ranks = np.broadcast_to(
+            np.arange(1, depth + 1, dtype=np.float64), self.slots.shape
+        )
+
+        for q, cand in enumerate(candidates):
+            slot_of: Dict[Hashable, int] = {}
+            labels: List[Hashable] = []
+            for r, (docs, scores) in enumerate(zip(cand.docs, cand.scores)):
+                for i, doc in enumerate(docs):
+                    key = ensemble._doc_key(doc)
+                    slot = slot_of.get(key)
+                    if slot is None:
+                        slot = slot_of[key] = len(labels)
+                        labels.append(self._label_of(doc))
+                    self.slots[q, r, i] = slot
+                self.norm[q, r, :len(docs)] = ensemble._normalize_scores(
+                    docs, cand.query, scores
+                )
+                self.mask[q, r, :len(docs)] = True
+            self._n_slots[q] = len(labels)
+            slot_rows.append([label in relevant[q] for label in labels])
+
+        self._width = max(int(self._n_slots.max(initial=0)), 1)
+        self.rel = np.zeros((n_queries, self._width), dtype=bool)
+        for q, row in enumerate(slot_rows):
+            self.rel[q, :len(row)] = row
+        self.n_relevant = np.array([len(ids) for ids in relevant], dtype=np.float64)
+
+    def _label_of(self, doc) -> Hashable:
+        """정답 비교용 문서 id"""
+        id_key = self.ensemble._id_key
+        if id_key is not None and doc.metadata.get(id_key) is not None:
+            return doc.metadata[id_key]
+        return doc.page_content
+
+    # ========================================
+    # 일괄 결합 + 평가
+    # ========================================
+
+    def _evaluate(self, contributions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        설정별 기여도 (G, Q, R, M) → 설정별 평균 recall / MRR / nDCG (G,)
+        """
+        n_configs = contributions.shape[0]
+        n_queries, width = self.rel.shape
+
+        # (설정, 쿼리, 슬롯) 단위로 한 번에 합산
+        offsets = (
+            np.arange(n_configs)[:, None, None, None] * n_queries
+            + np.arange(n_queries)[None, :, None, None]
+        ) * width
+        flat = (offsets + self.slots[None]).ravel()
+        weights = np.where(self.mask[None], contributions, 0.0).ravel()
+        totals = np.bincount(flat, weights=weights, minlength=n_configs * n_queries * width)
+        totals = totals.reshape(n_configs, n_queries, width)
+
+        # 없는 슬롯은 맨 뒤로
+        totals[:, np.arange(width)[None, :] >= self._n_slots[:, None]] = -np.inf
+
+        # 점수 내림차순, 동점은 먼저 등장한 문서 우선 (ensemble._fuse_ranked 와 동일)
+        k = min(self.k, width)
+        order = np.argsort(-totals, axis=-1, kind="stable")[..., :k]
+        hits = np.take_along_axis(
+            np.broadcast_to(self.rel, totals.shape), order, axis=-1
+        )
+        hits &= np.take_along_axis(totals, order, axis=-1) > -np.inf
+
+        has_rel = self.n_relevant > 0
+        n_rel = np.where(has_rel, self.n_relevant, 1.0)
+
+        # recall@k
+        recall = hits.sum(axis=-1) / n_rel
+
+        # MRR@k
+        first = np.argmax(hits, axis=-1)
+        mrr = np.where(hits.any(axis=-1), 1.0 / (first + 1), 0.0)
+
+        # nDCG@k (이진 관련도)
+        discounts = 1.0 / np.log2(np.arange(2, self.k + 2))
+        dcg = (hits * discounts[:k]).sum(axis=-1)
+        ideal = np.cumsum(discounts)[np.minimum(n_rel, self.k).astype(np.int64) - 1]
+        ndcg = dcg / ideal
+
+        # 정답이 없는 쿼리는 평균에서 제외
+        if not has_rel.any():
+            zeros = np.zeros(n_configs)
+            return zeros, zeros, zeros
+        return (
+            recall[:, has_rel].mean(axis=-1),
+            mrr[:, has_rel].mean(axis=-1),
+            ndcg[:, has_rel].mean(axis=-1),
+        )
+
+    def sweep_rrf(self, cs: Sequence[float]) -> List[SweepResult]:
+        """
+        RRF 상수 c 탐색
+
+        Args:
+            cs: 평가할 c 값들
+
+        Returns:
+            c 값별 SweepResult 리스트
+        """
+        if not self.queries or not cs:
+            return []
+        c_arr = np.asarray(cs, dtype=np.float64)[:, None, None, None]
+        contributions = 1.0 / (c_arr + self.ranks[None])
+        recall, mrr, ndcg = self._evaluate(contributions)
+        return [
+            SweepResult(EnsembleMethod.RRF, float(c), None, *metrics)
+            for c, *metrics in zip(cs, recall.tolist(), mrr.tolist(), ndcg.tolist())
+        ]
+
+    def sweep_cc(self, weights: Sequence[Sequence[float]]) -> List[SweepResult]:
+        """
+        CC 가중치 탐색
+
+        Args:
+            weights: 평가할 가중치들 (각각 합이 1이 되도록 정규화)
+
+        Returns:
+            가중치별 SweepResult 리스트
+        """
+        if not self.queries or not weights:
+            return []
+        normalized = [tuple(self.ensemble._normalize_weights(list(w))) for w in weights]
+        w_arr = np.asarray(normalized, dtype=np.float64)[:, None, :, None]
+        contributions = w_arr * self.norm[None]
+        recall, mrr, ndcg = self._evaluate(contributions)
+        return [
+            SweepResult(EnsembleMethod.CC, None, w, *metrics)
+            for w, *metrics in zip(normalized, recall.tolist(), mrr.tolist(), ndcg.tolist())
+        ]
+
+    def run(
+        self,
+        cs: Sequence[float] = (10, 30, 60, 100),
+        weights: Optional[Sequence[Sequence[float]]] = None
+    ) -> List[SweepResult]:
+        """
+        RRF + CC 전체 탐색
+
+        Args:
+            cs: RRF c 값들
+            weights: CC 가중치들 (None이면 weight_grid(검색기 수, 0.1))
+
+        Returns:
+            SweepResult 리스트 (nDCG 내림차순)
+        """
+        if weights is None:
+            weights = weight_grid(self.n_retrievers, 0.1)
+        results = self.sweep_rrf(cs) + self.sweep_cc(weights)
+        return sorted(results, key=lambda r: r.ndcg, reverse=True)
+
+
+# ========================================
+# 🎯 출력 함수
+# ========================================
+
+def print_sweep(results: List[SweepResult], top: int = 10):
+    """
+    탐색 결과 표 출력
+
+    Args:
+        results: SweepResult 리스트
+        top: 출력할 상위 개수
+    """
+    print(f"\n{'='*60}")
+    print("📊 Fusion 파라미터 탐색 결과")
+    print(f"{'='*60}")
+    print(f"{'method':<6} {'param':<22} {'recall':>8} {'MRR':>8} {'nDCG':>8}")
+    for r in results[:top]:
+        if r.method == EnsembleMethod.RRF:
+            param = f"c={r.c:g}"
+        else:
+            param = "w=" + ",".join(f"{w:.2f}" for w in r.weights)
+        print(f"{r.method.value:<6} {param:<22} {r.recall:>8.4f} {r.mrr:>8.4f} {r.ndcg:>8.4f}")
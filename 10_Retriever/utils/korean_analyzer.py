@@ -7,8 +7,11 @@
 
 from kiwipiepy import Kiwi
 import math
-from typing import List, Dict, Tuple, Optional
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Sequence
 from dataclasses import dataclass
+import numpy as np
 
 @dataclass
 class TokenInfo:
@@ -21,6 +24,110 @@ class TokenInfo:
     length: int           # 길이
     tagged_form: str      # 형태소/품사
 
+
+class _Interner:
+    """문자열 ↔ 정수 id 매핑 (형태소 / 품사 태그 공용)"""
+    
+    def __init__(self, initial: Sequence[str] = ()):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+        for value in initial:
+            self.id_of(value)
+    
+    def id_of(self, value: str) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.ids[value] = idx
+            self.values.append(value)
+        return idx
+    
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TokenColumns:
+    """
+    컬럼형 형태소 분석 결과 (TokenInfo 리스트의 경량 대체)
+    
+    - forms: 분석기 단위로 intern된 형태소 id (int32)
+    - tags: 품사 코드 (uint8)
+    - score: float64 (Kiwi 점수 그대로), start / length: int32
+    - probability: 처음 접근할 때 계산 (exp(score))
+    
+    Examples:
+        >>> cols = analyzer.analyze_columnar("Python은 좋은 언어입니다")
+        >>> mask = cols.tag_mask(['NNG', 'NNP']) & (cols.score > -10.0)
+        >>> cols.forms(mask)
+    """
+    
+    __slots__ = ('form_ids', 'tag_codes', 'score', 'start', 'length',
+                 '_forms', '_tags', '_probability')
+    
+    def __init__(
+        self,
+        form_ids: np.ndarray,
+        tag_codes: np.ndarray,
+        score: np.ndarray,
+        start: np.ndarray,
+        length: np.ndarray,
+        forms: _Interner,
+        tags: _Interner
+    ):
+        self.form_ids = form_ids
+        self.tag_codes = tag_codes
+        self.score = score
+        self.start = start
+        self.length = length
+        self._forms = forms
+        self._tags = tags
+        self._probability = None
+    
+    def __len__(self) -> int:
+        return len(self.form_ids)
+    
+    @property
+    def probability(self) -> np.ndarray:
+        """확률 (0~1), 필요할 때만 계산"""
+        if self._probability is None:
+            self._probability = np.exp(self.score)
+        return self._probability
+    
+    def tag_mask(self, pos_tags: Iterable[str]) -> np.ndarray:
+        """주어진 품사에 해당하는 토큰 마스크"""
+        codes = [self._tags.ids[t] for t in pos_tags if t in self._tags.ids]
+        return np.isin(self.tag_codes, codes)
+    
+    def forms(self, mask: Optional[np.ndarray] = None) -> List[str]:
+        """형태소 문자열 리스트 (mask 지정 시 해당 토큰만)"""
+        ids = self.form_ids if mask is None else self.form_ids[mask]
+        values = self._forms.values
+        return [values[i] for i in ids.tolist()]
+    
+    def tags(self, mask: Optional[np.ndarray] = None) -> List[str]:
+        """품사 태그 리스트 (mask 지정 시 해당 토큰만)"""
+        codes = self.tag_codes if mask is None else self.tag_codes[mask]
+        values = self._tags.values
+        return [values[c] for c in codes.tolist()]
+    
+    def to_token_infos(self) -> List[TokenInfo]:
+        """TokenInfo 리스트로 변환"""
+        return [
+            TokenInfo(
+                form=form,
+                tag=tag,
+                score=score,
+                probability=math.exp(score),
+                start=start,
+                length=length,
+                tagged_form=f"{form}/{tag}"
+            )
+            for form, tag, score, start, length in zip(
+                self.forms(), self.tags(), self.score.tolist(),
+                self.start.tolist(), self.length.tolist()
+            )
+        ]
+
 class KoreanMorphologicalAnalyzer:
     """
     한국어 형태소 분석 통합 클래스
@@ -30,11 +137,17 @@ class KoreanMorphologicalAnalyzer:
     - 신뢰도 기반 필터링
     - 품사별 토큰 추출
     - 상세 정보 조회
+    - 멀티스레드 배치 분석 (입력 순서대로 스트리밍)
+    - 컬럼형(NumPy) 분석 결과 + 벡터화 필터링
+    - 분석 결과 LRU 캐시 + 한 번의 분석으로 여러 품사 뷰 추출
     
     Examples:
         >>> analyzer = KoreanMorphologicalAnalyzer()
         >>> result = analyzer.analyze("안녕하세요")
         >>> keywords = analyzer.extract_keywords("Python은 좋은 언어입니다", confidence=-10.0)
+        >>> for keywords in analyzer.extract_keywords_batch(texts, chunk_size=512):
+        ...     print(keywords)
+        >>> views = analyzer.extract_views(text, views=['nouns', 'verbs', 'keywords'])
     """
     
     # 품사 태그 설명
@@ -64,11 +177,28 @@ class KoreanMorphologicalAnalyzer:
     # 의미있는 품사 (키워드 추출용)
     MEANINGFUL_TAGS = ['NNG', 'NNP', 'VV', 'VA', 'SL', 'SH', 'MM', 'MAG']
     
+    # 품사별 추출 그룹
+    NOUN_TAGS = ['NNG', 'NNP']
+    VERB_TAGS = ['VV']
+    ADJECTIVE_TAGS = ['VA']
+    
+    # extract_views 에서 사용할 수 있는 뷰 (품사 태그 그룹)
+    # 'keywords'는 confidence_threshold가 적용되는 MEANINGFUL_TAGS 뷰
+    VIEWS = {
+        'keywords': MEANINGFUL_TAGS,
+        'nouns': NOUN_TAGS,
+        'verbs': VERB_TAGS,
+        'adjectives': ADJECTIVE_TAGS,
+    }
+    
     def __init__(
         self, 
         model_type: str = 'sbg',
         typos: str = 'basic',
-        load_default_dict: bool = True
+        load_default_dict: bool = True,
+        num_workers: Optional[int] = None,
+        cache_size: int = 128,
+        max_forms: int = 100_000
     ):
         """
         초기화
@@ -77,13 +207,31 @@ class KoreanMorphologicalAnalyzer:
             model_type: 모델 타입 ('sbg', 'knlm')
             typos: 오타 교정 수준 ('basic', 'auto', 'disabled')
             load_default_dict: 기본 사전 로드 여부
+            num_workers: 배치 분석 스레드 수 (None이면 Kiwi 기본값, 0이면 전체 코어)
+            cache_size: 분석 결과 LRU 캐시 크기 (0이면 캐시 미사용)
+            max_forms: 형태소 intern 테이블 최대 크기. 넘으면 새 테이블로 교체
+                (대량 분석에서도 메모리가 계속 늘지 않음, 이전 결과는 자기 테이블을 계속 참조)
         """
+        kiwi_kwargs = {}
+        if num_workers is not None:
+            kiwi_kwargs['num_workers'] = num_workers
+        
         self.kiwi = Kiwi(
             model_type=model_type,
             typos=typos,
-            load_default_dict=load_default_dict
+            load_default_dict=load_default_dict,
+            **kiwi_kwargs
         )
         self.last_analysis = None
+        
+        # 컬럼형 결과용 intern 테이블 (품사는 uint8 코드)
+        self.max_forms = max_forms
+        self._forms = _Interner()
+        self._tags = _Interner(self.POS_TAGS)
+        
+        # 텍스트 → TokenColumns LRU 캐시
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, TokenColumns]" = OrderedDict()
     
     def analyze(self, text: str) -> List[TokenInfo]:
         """
@@ -95,11 +243,105 @@ class KoreanMorphologicalAnalyzer:
         Returns:
             TokenInfo 객체 리스트
         """
-        tokens = self.kiwi.tokenize(text)
+        result = self._to_token_infos(self.kiwi.tokenize(text))
         
-        result = []
-        for token in tokens:
-            result.append(TokenInfo(
+        self.last_analysis = result
+        return result
+    
+    def analyze_batch(
+        self,
+        texts: Iterable[str],
+        chunk_size: int = 256,
+        columnar: bool = False
+    ) -> Iterator:
+        """
+        여러 텍스트 배치 형태소 분석 (Kiwi 멀티스레드)
+        
+        chunk_size 개씩 Kiwi에 넘기고, 결과는 입력 순서대로 하나씩 반환한다.
+        (last_analysis는 갱신하지 않음)
+        
+        Args:
+            texts: 분석할 텍스트들 (제너레이터 가능)
+            chunk_size: 한 번에 Kiwi에 넘길 텍스트 개수
+            columnar: True면 TokenColumns 반환
+            
+        Yields:
+            텍스트별 TokenInfo 객체 리스트 (columnar=True면 TokenColumns)
+        """
+        convert = self._to_columns if columnar else self._to_token_infos
+        
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size는 1 이상이어야 합니다: {chunk_size}")
+        
+        iterator = iter(texts)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            for tokens in self.kiwi.tokenize(chunk):
+                yield convert(tokens)
+    
+    def analyze_columnar(self, text: str) -> TokenColumns:
+        """
+        텍스트 형태소 분석 (컬럼형 결과)
+        
+        TokenInfo 객체를 만들지 않고, last_analysis도 갱신하지 않는다.
+        같은 텍스트는 LRU 캐시에서 바로 반환한다 (Kiwi 재실행 X).
+        
+        Args:
+            text: 분석할 텍스트
+            
+        Returns:
+            TokenColumns 인스턴스
+        """
+        cols = self._cache.get(text)
+        if cols is not None:
+            self._cache.move_to_end(text)
+            return cols
+        
+        cols = self._to_columns(self.kiwi.tokenize(text))
+        
+        if self.cache_size > 0:
+            self._cache[text] = cols
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return cols
+    
+    def clear_cache(self):
+        """분석 결과 캐시 비우기"""
+        self._cache.clear()
+    
+    def _to_columns(self, tokens) -> TokenColumns:
+        """Kiwi Token → TokenColumns 변환"""
+        if len(self._forms) >= self.max_forms:
+            # 기존 테이블은 비우지 않고 교체 (이미 만든 TokenColumns의 id가 그대로 유효)
+            self._forms = _Interner()
+        form_id = self._forms.id_of
+        tag_id = self._tags.id_of
+        
+        n = len(tokens)
+        form_ids = np.empty(n, dtype=np.int32)
+        tag_codes = np.empty(n, dtype=np.uint8)
+        score = np.empty(n, dtype=np.float64)
+        start = np.empty(n, dtype=np.int32)
+        length = np.empty(n, dtype=np.int32)
+        
+        for i, token in enumerate(tokens):
+            form_ids[i] = form_id(token.form)
+            tag_codes[i] = tag_id(token.tag)
+            score[i] = token.score
+            start[i] = token.start
+            length[i] = token.len
+        
+        return TokenColumns(
+            form_ids, tag_codes, score, start, length, self._forms, self._tags
+        )
+    
+    @staticmethod
+    def _to_token_infos(tokens) -> List[TokenInfo]:
+        """Kiwi Token → TokenInfo 변환"""
+        return [
+            TokenInfo(
                 form=token.form,
                 tag=token.tag,
                 score=token.score,
@@ -107,10 +349,9 @@ class KoreanMorphologicalAnalyzer:
                 start=token.start,
                 length=token.len,
                 tagged_form=token.tagged_form
-            ))
-        
-        self.last_analysis = result
-        return result
+            )
+            for token in tokens
+        ]
     
     def extract_keywords(
         self, 
@@ -132,14 +373,43 @@ class KoreanMorphologicalAnalyzer:
         if pos_tags is None:
             pos_tags = self.MEANINGFUL_TAGS
         
-        tokens = self.analyze(text)
+        cols = self.analyze_columnar(text)
+        return self._keyword_forms(cols, confidence_threshold, pos_tags)
+    
+    @staticmethod
+    def _keyword_forms(
+        cols: TokenColumns,
+        confidence_threshold: float,
+        pos_tags: Iterable[str]
+    ) -> List[str]:
+        """신뢰도 + 품사 마스크로 키워드 필터링"""
+        mask = (cols.score > confidence_threshold) & cols.tag_mask(pos_tags)
+        return cols.forms(mask)
+    
+    def extract_keywords_batch(
+        self,
+        texts: Iterable[str],
+        confidence_threshold: float = -10.0,
+        pos_tags: Optional[List[str]] = None,
+        chunk_size: int = 256
+    ) -> Iterator[List[str]]:
+        """
+        여러 텍스트 배치 키워드 추출 (Kiwi 멀티스레드)
         
-        keywords = [
-            token.form for token in tokens
-            if token.score > confidence_threshold and token.tag in pos_tags
-        ]
+        Args:
+            texts: 분석할 텍스트들 (제너레이터 가능)
+            confidence_threshold: 신뢰도 임계값 (낮을수록 엄격)
+            pos_tags: 추출할 품사 태그 (기본: MEANINGFUL_TAGS)
+            chunk_size: 한 번에 Kiwi에 넘길 텍스트 개수
+            
+        Yields:
+            텍스트별 키워드 리스트 (입력 순서)
+        """
+        if pos_tags is None:
+            pos_tags = self.MEANINGFUL_TAGS
         
-        return keywords
+        for cols in self.analyze_batch(texts, chunk_size=chunk_size, columnar=True):
+            yield self._keyword_forms(cols, confidence_threshold, pos_tags)
     
     def extract_by_pos(self, text: str, pos_tag: str) -> List[str]:
         """
@@ -152,13 +422,13 @@ class KoreanMorphologicalAnalyzer:
         Returns:
             해당 품사의 형태소 리스트
         """
-        tokens = self.analyze(text)
-        return [token.form for token in tokens if token.tag == pos_tag]
+        cols = self.analyze_columnar(text)
+        return cols.forms(cols.tag_mask([pos_tag]))
     
     def extract_nouns(self, text: str) -> List[str]:
         """명사만 추출 (일반명사 + 고유명사)"""
-        tokens = self.analyze(text)
-        return [token.form for token in tokens if token.tag in ['NNG', 'NNP']]
+        cols = self.analyze_columnar(text)
+        return cols.forms(cols.tag_mask(self.NOUN_TAGS))
     
     def extract_verbs(self, text: str) -> List[str]:
         """동사만 추출"""
@@ -168,6 +438,40 @@ class KoreanMorphologicalAnalyzer:
         """형용사만 추출"""
         return self.extract_by_pos(text, 'VA')
     
+    def extract_views(
+        self,
+        text: str,
+        views: Sequence[str] = ('keywords', 'nouns', 'verbs', 'adjectives'),
+        confidence_threshold: float = -10.0
+    ) -> Dict[str, List[str]]:
+        """
+        한 번의 분석으로 여러 품사 뷰를 함께 추출
+        
+        Args:
+            text: 분석할 텍스트
+            views: 추출할 뷰 이름 (VIEWS 키), 그 외 이름은 품사 태그로 취급 ('NNG', 'MAG' 등)
+            confidence_threshold: 'keywords' 뷰의 신뢰도 임계값
+            
+        Returns:
+            {뷰 이름: 형태소 리스트} 딕셔너리
+            
+        Examples:
+            >>> analyzer.extract_views("RAG 시스템을 쉽게 만들 수 있어요.", views=['nouns', 'verbs'])
+            {'nouns': ['시스템'], 'verbs': ['만들']}
+        """
+        # Kiwi는 한 번만 실행 (캐시 적중 시 0번)
+        cols = self.analyze_columnar(text)
+        
+        result = {}
+        for view in views:
+            if view == 'keywords':
+                result[view] = self._keyword_forms(
+                    cols, confidence_threshold, self.MEANINGFUL_TAGS
+                )
+            else:
+                result[view] = cols.forms(cols.tag_mask(self.VIEWS.get(view, [view])))
+        return result
+    
     def get_detailed_info(self, text: str) -> List[Dict]:
         """
         상세 정보 포함 분석
@@ -212,34 +516,38 @@ class KoreanMorphologicalAnalyzer:
         Returns:
             분석 결과 딕셔너리
         """
-        tokens = self.analyze(text)
+        cols = self.analyze_columnar(text)
         
-        # 신뢰도 높은 토큰 필터링
-        confident_tokens = [
-            token for token in tokens
-            if token.score > confidence_threshold 
-            and token.tag in self.MEANINGFUL_TAGS
-        ]
+        # 신뢰도 높은 토큰 필터링 (벡터화 마스크)
+        confident = (
+            (cols.score > confidence_threshold)
+            & cols.tag_mask(self.MEANINGFUL_TAGS)
+        )
         
         result = {
             '원본': text,
-            '전체토큰수': len(tokens),
-            '키워드수': len(confident_tokens),
-            '키워드': [t.form for t in confident_tokens],
-            '명사': [t.form for t in confident_tokens if t.tag in ['NNG', 'NNP']],
-            '동사': [t.form for t in confident_tokens if t.tag == 'VV'],
-            '형용사': [t.form for t in confident_tokens if t.tag == 'VA'],
+            '전체토큰수': len(cols),
+            '키워드수': int(confident.sum()),
+            '키워드': cols.forms(confident),
+            '명사': cols.forms(confident & cols.tag_mask(self.NOUN_TAGS)),
+            '동사': cols.forms(confident & cols.tag_mask(self.VERB_TAGS)),
+            '형용사': cols.forms(confident & cols.tag_mask(self.ADJECTIVE_TAGS)),
         }
         
         if show_details:
             result['상세정보'] = [
                 {
-                    '형태소': t.form,
-                    '품사': t.tag,
-                    '점수': round(t.score, 4),
-                    '확률': round(t.probability, 6)
+                    '형태소': form,
+                    '품사': tag,
+                    '점수': round(score, 4),
+                    '확률': round(prob, 6)
                 }
-                for t in confident_tokens
+                for form, tag, score, prob in zip(
+                    cols.forms(confident),
+                    cols.tags(confident),
+                    cols.score[confident].tolist(),
+                    cols.probability[confident].tolist()
+                )
             ]
         
         return result
@@ -375,8 +683,8 @@ def example_batch_processing():
     ]
     
     print("📚 문서별 키워드 추출:\n")
-    for i, doc in enumerate(documents):
-        keywords = analyzer.extract_keywords(doc, confidence_threshold=-8.0)
+    keywords_batch = analyzer.extract_keywords_batch(documents, confidence_threshold=-8.0)
+    for i, (doc, keywords) in enumerate(zip(documents, keywords_batch)):
         print(f"[{i+1}] {doc}")
         print(f"    → 키워드: {keywords}\n")
 
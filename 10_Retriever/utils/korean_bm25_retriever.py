@@ -3,8 +3,15 @@
 from kiwipiepy import Kiwi
 from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
-from typing import List, Optional
-import math
+from typing import List, Optional, Tuple
+import heapq
+
+try:
+    from utils.bm25_index import BM25Index
+    from utils.token_cache import TokenCache
+except ImportError:
+    from bm25_index import BM25Index
+    from token_cache import TokenCache
 
 class KoreanBM25Retriever:
     """
@@ -12,34 +19,52 @@ class KoreanBM25Retriever:
     
     Features:
     - Kiwi 형태소 분석 기반 토큰화
-    - BM25 알고리즘 검색
-    - 유사도 점수 계산
+    - BM25 알고리즘 검색 (역색인 기반 BM25Index 엔진)
+    - 실제 BM25 유사도 점수 계산
+    - 토큰화 결과 디스크 캐시 (cache_path 지정 시)
+    - search_with_scores: (Document, 점수) 반환 → 앙상블 CC 결합에 실제 점수 전달
     - 검색 결과 개수 조정 (k)
     
     Examples:
         >>> retriever = KoreanBM25Retriever.from_texts(texts)
         >>> results = retriever.invoke("검색어")
         >>> results_with_score = retriever.search_with_score("검색어")
+        >>> # 재시작 후 재색인 시 변경 없는 문서는 형태소 분석 생략
+        >>> retriever = KoreanBM25Retriever.from_texts(texts, cache_path="cache/tokens.db")
     """
     
+    # 의미있는 형태소만 추출 (명사, 동사, 형용사, 외국어)
+    MEANINGFUL_TAGS = ['NNG', 'NNP', 'VV', 'VA', 'SL', 'SH']
+    MIN_TOKEN_LENGTH = 2
+    
     def __init__(
         self,
-        retriever: BM25Retriever,
+        retriever: Optional[BM25Retriever],
         kiwi: Kiwi,
-        k: int = 4
+        k: int = 4,
+        index: Optional[BM25Index] = None,
+        documents: Optional[List[Document]] = None
     ):
         """
         초기화
         
         Args:
-            retriever: BM25Retriever 인스턴스
+            retriever: BM25Retriever 인스턴스 (index 사용 시 None 가능)
             kiwi: Kiwi 인스턴스
             k: 반환할 문서 개수
+            index: 역색인 BM25 엔진 (있으면 우선 사용)
+            documents: index의 문서 id 순서와 같은 Document 리스트
         """
+        if retriever is None and index is None:
+            raise ValueError("retriever 또는 index 중 하나는 필요합니다.")
+        
         self.retriever = retriever
         self.kiwi = kiwi
+        self.index = index
+        self.documents = documents or []
         self.k = k
-        self.retriever.k = k
+        if self.retriever is not None:
+            self.retriever.k = k
     
     @classmethod
     def from_texts(
@@ -60,20 +85,6 @@ class KoreanBM25Retriever:
         Returns:
             KoreanBM25Retriever 인스턴스
         """
-        # Kiwi 인스턴스 생성
-        kiwi = Kiwi()
-        
-        # 토크나이저 함수 정의
-        def korean_tokenizer(text: str) -> List[str]:
-            """Kiwi 기반 한국어 토크나이저"""
-            tokens = kiwi.tokenize(text)
-            # 의미있는 형태소만 추출 (명사, 동사, 형용사, 외국어)
-            meaningful_tags = ['NNG', 'NNP', 'VV', 'VA', 'SL', 'SH']
-            return [
-                token.form for token in tokens 
-                if token.tag in meaningful_tags and len(token.form) > 1
-            ]
-        
         # Document 객체 생성
         if metadatas:
             docs = [
@@ -83,20 +94,15 @@ class KoreanBM25Retriever:
         else:
             docs = [Document(page_content=text) for text in texts]
         
-        # BM25Retriever 생성 (Kiwi 토크나이저 적용)
-        bm25_retriever = BM25Retriever.from_documents(
-            docs,
-            preprocess_func=korean_tokenizer
-        )
-        bm25_retriever.k = k
-        
-        return cls(bm25_retriever, kiwi, k)
+        return cls.from_documents(docs, k=k, **kwargs)
     
     @classmethod
     def from_documents(
         cls,
         documents: List[Document],
         k: int = 4,
+        cache_path: Optional[str] = None,
+        model_type: Optional[str] = None,
         **kwargs
     ) -> "KoreanBM25Retriever":
         """
@@ -105,31 +111,40 @@ class KoreanBM25Retriever:
         Args:
             documents: Document 객체 리스트
             k: 반환할 문서 개수
+            cache_path: 토큰 캐시 파일 경로 (None이면 캐시 미사용)
+            model_type: Kiwi 모델 타입 (None이면 기본 모델)
             
         Returns:
             KoreanBM25Retriever 인스턴스
         """
         # Kiwi 인스턴스 생성
-        kiwi = Kiwi()
+        kiwi = Kiwi(model_type=model_type) if model_type else Kiwi()
         
-        # 토크나이저 함수 정의
-        def korean_tokenizer(text: str) -> List[str]:
-            """Kiwi 기반 한국어 토크나이저"""
-            tokens = kiwi.tokenize(text)
-            meaningful_tags = ['NNG', 'NNP', 'VV', 'VA', 'SL', 'SH']
-            return [
-                token.form for token in tokens 
-                if token.tag in meaningful_tags and len(token.form) > 1
-            ]
+        # 색인 시점에 문서별로 한 번만 토큰화 → 역색인 생성
+        documents = list(documents)
+        texts = [doc.page_content for doc in documents]
         
-        # BM25Retriever 생성
-        bm25_retriever = BM25Retriever.from_documents(
-            documents,
-            preprocess_func=korean_tokenizer
-        )
-        bm25_retriever.k = k
+        def tokenize_batch(batch: List[str]) -> List[List[str]]:
+            return cls._tokenize_batch_with(kiwi, batch)
+        
+        if cache_path:
+            # 캐시에 있는 문서는 형태소 분석 생략
+            cache = TokenCache(
+                cache_path,
+                tags=cls.MEANINGFUL_TAGS,
+                min_length=cls.MIN_TOKEN_LENGTH,
+                model_type=model_type
+            )
+            try:
+                tokenized_corpus = cache.tokenize(texts, tokenize_batch)
+            finally:
+                cache.close()
+        else:
+            tokenized_corpus = tokenize_batch(texts)
         
-        return cls(bm25_retriever, kiwi, k)
+        index = BM25Index.build(tokenized_corpus)
+        
+        return cls(None, kiwi, k, index=index, documents=documents)
     
     def invoke(self, query: str) -> List[Document]:
         """
@@ -141,7 +156,10 @@ class KoreanBM25Retriever:
         Returns:
             검색된 Document 리스트
         """
-        return self.retriever.invoke(query)
+        if self.index is None:
+            return self.retriever.invoke(query)
+        
+        return [doc for doc, _ in self._search(query)]
     
     def search_with_score(self, query: str) -> List[Document]:
         """
@@ -153,47 +171,92 @@ class KoreanBM25Retriever:
         Returns:
             점수가 메타데이터에 포함된 Document 리스트
         """
-        # 기본 검색 수행
-        docs = self.retriever.invoke(query)
-        
-        # 점수 계산 (간단한 BM25 점수 근사)
-        # 실제로는 retriever 내부의 BM25 점수를 사용해야 하지만
-        # 여기서는 교재 스타일로 정규화된 점수 계산
-        
-        # 쿼리 토큰화
-        query_tokens = self._tokenize(query)
-        
-        # 각 문서의 점수 계산
         scored_docs = []
-        for doc in docs:
-            doc_tokens = self._tokenize(doc.page_content)
-            
-            # 단순 overlap 기반 점수 (0~1 정규화)
-            common_tokens = set(query_tokens) & set(doc_tokens)
-            score = len(common_tokens) / max(len(query_tokens), 1)
-            
+        for doc, score in self._search(query):
             # 메타데이터에 점수 추가
             new_metadata = doc.metadata.copy()
             new_metadata['score'] = score
             
-            scored_doc = Document(
+            scored_docs.append(Document(
                 page_content=doc.page_content,
                 metadata=new_metadata
-            )
-            scored_docs.append(scored_doc)
-        
-        # 점수 기준 정렬
-        scored_docs.sort(key=lambda x: x.metadata['score'], reverse=True)
+            ))
         
         return scored_docs
     
+    def search_with_scores(
+        self,
+        query: str,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        BM25 점수와 함께 검색 (ScoredRetriever 프로토콜)
+        
+        메타데이터를 복사하지 않고 원본 Document와 점수를 그대로 반환한다.
+        (CustomEnsembleRetriever의 CC 결합에서 사용)
+        
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 개수 (None이면 검색기의 k)
+            
+        Returns:
+            (Document, BM25 점수) 튜플 리스트 (점수 내림차순)
+        """
+        return self._search(query, k)
+    
+    def _search(
+        self,
+        query: str,
+        k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        실제 BM25 점수와 함께 상위 k개 검색 (점수 내림차순)
+        
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 개수 (None이면 검색기의 k)
+            
+        Returns:
+            (Document, BM25 점수) 튜플 리스트
+        """
+        if k is None:
+            k = self.k
+        
+        if self.index is not None:
+            # 역색인: 쿼리 토큰의 포스팅만 점수 계산
+            hits = self.index.search(self._tokenize(query), k)
+            return [(self.documents[doc_id], score) for doc_id, score in hits]
+        
+        # BM25Retriever로 생성된 경우: 내부 BM25Okapi 점수 사용
+        scores = self.retriever.vectorizer.get_scores(
+            self.retriever.preprocess_func(query)
+        )
+        top = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [(self.retriever.docs[i], float(scores[i])) for i in top]
+    
     def _tokenize(self, text: str) -> List[str]:
         """내부 토큰화 함수"""
-        tokens = self.kiwi.tokenize(text)
-        meaningful_tags = ['NNG', 'NNP', 'VV', 'VA', 'SL', 'SH']
+        return self._tokenize_with(self.kiwi, text)
+    
+    @classmethod
+    def _tokenize_with(cls, kiwi: Kiwi, text: str) -> List[str]:
+        """Kiwi 기반 한국어 토크나이저"""
+        return cls._filter_tokens(kiwi.tokenize(text))
+    
+    @classmethod
+    def _tokenize_batch_with(cls, kiwi: Kiwi, texts: List[str]) -> List[List[str]]:
+        """Kiwi 배치 토큰화 (멀티스레드)"""
+        if not texts:
+            return []
+        return [cls._filter_tokens(tokens) for tokens in kiwi.tokenize(texts)]
+    
+    @classmethod
+    def _filter_tokens(cls, tokens) -> List[str]:
+        """의미있는 형태소만 남기기"""
         return [
             token.form for token in tokens 
-            if token.tag in meaningful_tags and len(token.form) > 1
+            if token.tag in cls.MEANINGFUL_TAGS
+            and len(token.form) >= cls.MIN_TOKEN_LENGTH
         ]
     
     def get_relevant_documents(self, query: str) -> List[Document]:
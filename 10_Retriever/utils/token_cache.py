@@ -0,0 +1,175 @@
+# 10_Retriever/utils/token_cache.py
+
+# ========================================
+# 🏆 TokenCache (토큰화 결과 영구 캐시)
+# 문서 내용 해시 + 토크나이저 설정 기반
+# ========================================
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import kiwipiepy
+
+
+# 토큰 구분자 (형태소에 등장하지 않는 Unit Separator)
+_SEP = "\x1f"
+
+# SQLite 바인딩 변수 제한 대비 조회 배치 크기
+_LOOKUP_BATCH = 500
+
+
+class TokenCache:
+    """
+    Kiwi 토큰화 결과를 디스크에 저장하는 캐시
+
+    Features:
+    - 문서 내용 해시(blake2b) 기반 키
+    - 토크나이저 설정(품사 태그, 최소 길이, 모델 타입, kiwipiepy 버전)별 분리
+    - SQLite 단일 파일 저장 (토큰은 구분자로 연결한 UTF-8 바이트)
+    - 캐시에 없는 문서만 일괄 토큰화
+
+    Examples:
+        >>> cache = TokenCache("cache/tokens.db", tags=["NNG", "NNP"], min_length=2)
+        >>> tokens = cache.tokenize(texts, tokenize_batch)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        tags: Sequence[str],
+        min_length: int = 2,
+        model_type: Optional[str] = None
+    ):
+        """
+        초기화
+
+        Args:
+            path: 캐시 파일 경로 (SQLite)
+            tags: 토크나이저가 남기는 품사 태그
+            min_length: 토크나이저 최소 형태소 길이
+            model_type: Kiwi 모델 타입 (None이면 기본 모델)
+        """
+        self.path = path
+        self.config_key = self.make_config_key(tags, min_length, model_type)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            " config TEXT NOT NULL,"
+            " digest BLOB NOT NULL,"
+            " tokens BLOB NOT NULL,"
+            " PRIMARY KEY (config, digest)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_config_key(
+        tags: Sequence[str],
+        min_length: int,
+        model_type: Optional[str]
+    ) -> str:
+        """토크나이저 설정 → 캐시 구분 키"""
+        config = {
+            "tags": sorted(tags),
+            "min_length": min_length,
+            "model_type": model_type or "default",
+            "kiwipiepy": kiwipiepy.__version__,
+        }
+        raw = json.dumps(config, sort_keys=True).encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """문서 내용 해시 (16 bytes)"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, digests: Sequence[bytes]) -> Dict[bytes, List[str]]:
+        """
+        캐시 조회
+
+        Args:
+            digests: 문서 해시 리스트
+
+        Returns:
+            {해시: 토큰 리스트} (캐시에 있는 것만)
+        """
+        found: Dict[bytes, List[str]] = {}
+        for i in range(0, len(digests), _LOOKUP_BATCH):
+            batch = digests[i:i + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT digest, tokens FROM tokens "
+                f"WHERE config = ? AND digest IN ({placeholders})",
+                [self.config_key, *batch]
+            )
+            for digest, blob in rows:
+                found[digest] = self._decode(blob)
+        return found
+
+    def put_many(self, items: Iterable) -> None:
+        """
+        캐시 저장
+
+        Args:
+            items: (해시, 토큰 리스트) 튜플
+        """
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO tokens (config, digest, tokens) VALUES (?, ?, ?)",
+            (
+                (self.config_key, digest, self._encode(tokens))
+                for digest, tokens in items
+            )
+        )
+        self._conn.commit()
+
+    def tokenize(
+        self,
+        texts: Sequence[str],
+        tokenize_batch: Callable[[List[str]], List[List[str]]]
+    ) -> List[List[str]]:
+        """
+        캐시를 거쳐 코퍼스 토큰화
+
+        Args:
+            texts: 문서 텍스트 리스트
+            tokenize_batch: 캐시에 없는 텍스트들을 한 번에 토큰화하는 함수
+
+        Returns:
+            texts와 같은 순서의 토큰 리스트
+        """
+        digests = [self.digest(text) for text in texts]
+        cached = self.get_many(list(set(digests)))
+
+        # 캐시에 없는 문서만 (중복 내용은 한 번만) 토큰화
+        missing: Dict[bytes, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest not in cached and digest not in missing:
+                missing[digest] = text
+
+        if missing:
+            new_tokens = tokenize_batch(list(missing.values()))
+            fresh = dict(zip(missing.keys(), new_tokens))
+            self.put_many(fresh.items())
+            cached.update(fresh)
+
+        return [cached[digest] for digest in digests]
+
+    def close(self) -> None:
+        """캐시 파일 닫기"""
+        self._conn.close()
+
+    @staticmethod
+    def _encode(tokens: List[str]) -> bytes:
+        return _SEP.join(tokens).encode("utf-8")
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[str]:
+        return blob.decode("utf-8").split(_SEP) if blob else []
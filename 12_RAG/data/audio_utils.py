@@ -1,9 +1,14 @@
 import re
 import os
+import struct
+import wave
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import numpy as np
 from pytube import YouTube
 from moviepy.editor import AudioFileClip, VideoFileClip
 from pydub import AudioSegment
-from pydub.silence import detect_nonsilent
 
 
 def extract_abr(abr):
@@ -74,6 +79,65 @@ def download_audio_from_youtube(link):
     return new_filepath
 
 
+def _resampled_blocks(container, sample_rate):
+    # 열린 컨테이너의 첫 오디오 스트림 → mono int16 PCM 블록
+    import av
+
+    stream = container.streams.audio[0]
+    stream.thread_type = "AUTO"
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+    for frame in container.decode(stream):
+        for resampled in resampler.resample(frame):
+            yield resampled.to_ndarray().reshape(-1)
+    # 리샘플러에 남은 샘플
+    for resampled in resampler.resample(None):
+        yield resampled.to_ndarray().reshape(-1)
+
+
+def decode_audio_pcm(media_filepath, sample_rate=16000):
+    # 영상 / 오디오 파일 → mono int16 PCM 블록 (PyAV로 디코딩하면서 바로 리샘플, ffmpeg 실행 파일 불필요)
+    import av
+
+    with av.open(media_filepath) as container:
+        yield from _resampled_blocks(container, sample_rate)
+
+
+def decode_audio_array(media_filepath, sample_rate=16000):
+    # 영상 / 오디오 파일 → mono int16 PCM 배열 하나
+    # 컨테이너 길이로 버퍼를 미리 할당하고 블록을 바로 기록 (블록 리스트 + concatenate 복사 없음)
+    import av
+
+    with av.open(media_filepath) as container:
+        duration = container.duration  # av.time_base (1e6) 단위, 모르면 None
+        capacity = sample_rate * 60
+        if duration:
+            capacity = int(duration * sample_rate // av.time_base) + sample_rate
+        samples = np.empty(capacity, dtype=np.int16)
+        n = 0
+        for block in _resampled_blocks(container, sample_rate):
+            if n + len(block) > len(samples):
+                # 길이를 모르거나 실제가 더 길면 두 배씩 늘림 (realloc, 가능하면 제자리)
+                samples.resize(max(2 * len(samples), n + len(block)), refcheck=False)
+            samples[n:n + len(block)] = block
+            n += len(block)
+    samples.resize(n, refcheck=False)
+    return samples
+
+
+def extract_speech_audio(media_filepath, audio_filepath=None, sample_rate=16000):
+    # 음성 인식용 mono 16kHz WAV로 바로 저장 (44.1kHz 스테레오 중간 파일 없이, 블록 단위로 기록)
+    if audio_filepath is None:
+        filename = os.path.splitext(os.path.basename(media_filepath))[0] + ".wav"
+        audio_filepath = get_audio_filepath(filename)
+    with wave.open(audio_filepath, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        for block in decode_audio_pcm(media_filepath, sample_rate):
+            f.writeframes(block.tobytes())
+    return audio_filepath
+
+
 def extract_audio_from_video(video_filepath):
     # MP4 파일 로드
     video = VideoFileClip(video_filepath)
@@ -82,13 +146,358 @@ def extract_audio_from_video(video_filepath):
     return audio_filepath
 
 
+def read_wav_header(filepath):
+    # RIFF 청크를 따라가며 fmt / data 위치 확인 (샘플은 읽지 않음)
+    with open(filepath, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"WAV 파일이 아닙니다: {filepath}")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"data 청크가 없습니다: {filepath}")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                f.seek(size % 2, 1)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(size + size % 2, 1)
+
+    if fmt is None:
+        raise ValueError(f"fmt 청크가 없습니다: {filepath}")
+    audio_format, channels, frame_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if audio_format == 0xFFFE:
+        # WAVE_FORMAT_EXTENSIBLE: 실제 포맷은 SubFormat GUID 앞 2바이트
+        audio_format = struct.unpack("<H", fmt[24:26])[0]
+
+    if audio_format == 1 and bits in (8, 16, 32):
+        dtype = {8: np.uint8, 16: np.int16, 32: np.int32}[bits]
+    elif audio_format == 3 and bits in (32, 64):
+        dtype = {32: np.float32, 64: np.float64}[bits]
+    else:
+        raise ValueError(f"지원하지 않는 WAV 포맷입니다 (format={audio_format}, bits={bits})")
+
+    # 녹음 중 잘린 파일은 data 크기가 맞지 않을 수 있으므로 파일 크기로 제한
+    frame_width = channels * bits // 8
+    data_size = min(size, os.path.getsize(filepath) - data_offset)
+    return {
+        "data_offset": data_offset,
+        "n_frames": data_size // frame_width,
+        "channels": channels,
+        "frame_rate": frame_rate,
+        "dtype": dtype,
+    }
+
+
+def open_wav_samples(filepath):
+    # WAV 샘플을 (프레임, 채널) 배열로 메모리 맵 (파일 전체를 읽지 않음)
+    header = read_wav_header(filepath)
+    samples = np.memmap(
+        filepath,
+        dtype=header["dtype"],
+        mode="r",
+        offset=header["data_offset"],
+        shape=(header["n_frames"], header["channels"]),
+    )
+    return samples, header["frame_rate"]
+
+
+def max_amplitude(dtype):
+    if np.issubdtype(dtype, np.floating):
+        return 1.0
+    if dtype == np.uint8:
+        return 128
+    return 2 ** (np.dtype(dtype).itemsize * 8 - 1)
+
+
+def ms_frame_bounds(n_ms, frame_rate):
+    # pydub과 같은 ms → 프레임 변환 (int(ms * frame_rate / 1000))
+    return (np.arange(n_ms + 1, dtype=np.int64) * frame_rate) // 1000
+
+
+def ms_energy(samples, frame_rate, window_ms=60_000):
+    # 1ms 단위 제곱합 (채널 합산), window_ms 씩 읽어서 계산
+    n_frames = len(samples)
+    n_ms = int(round(n_frames * 1000 / frame_rate))
+    bounds = np.minimum(ms_frame_bounds(n_ms, frame_rate), n_frames)
+
+    # 16bit 이하 정수는 int64 누적합 (정확), 32bit 정수는 제곱이 int64를 넘으므로 float64
+    exact = not np.issubdtype(samples.dtype, np.floating) and samples.dtype.itemsize < 4
+    acc = np.int64 if exact else np.float64
+    energy = np.empty(n_ms, dtype=acc)
+    for w0 in range(0, n_ms, window_ms):
+        w1 = min(n_ms, w0 + window_ms)
+        f0, f1 = bounds[w0], bounds[w1]
+        block = np.asarray(samples[f0:f1], dtype=acc)
+        if samples.dtype == np.uint8:
+            block = block - 128
+        power = (block * block).sum(axis=1)
+        starts = bounds[w0:w1] - f0
+        ends = bounds[w0 + 1:w1 + 1] - f0
+        if exact:
+            cum = np.zeros(f1 - f0 + 1, dtype=acc)
+            np.cumsum(power, out=cum[1:])
+            energy[w0:w1] = cum[ends] - cum[starts]
+        else:
+            # 1ms 마다 바로 합산 (큰 누적합끼리 빼는 반올림 오차 없음, 빈 구간은 0)
+            sums = np.add.reduceat(np.append(power, 0.0), starts)
+            energy[w0:w1] = np.where(ends > starts, sums, 0.0)
+    return energy
+
+
+def _slice_starts(seg_len, min_silence_len, seek_step):
+    # pydub과 같은 검사 위치 (마지막 위치는 항상 포함)
+    last = seg_len - min_silence_len
+    starts = np.arange(0, last + 1, seek_step, dtype=np.int64)
+    if last % seek_step:
+        starts = np.append(starts, last)
+    return starts
+
+
+def detect_silence_energy(
+    energy, frame_rate, channels, min_silence_len, silence_thresh, amplitude, seek_step=1
+):
+    # 1ms 에너지 배열 → 무음 구간 [[start, end], ...] (pydub detect_silence와 같은 의미)
+    seg_len = len(energy)
+    if seg_len < min_silence_len:
+        return np.empty((0, 2), dtype=np.int64)
+
+    bounds = ms_frame_bounds(seg_len, frame_rate)
+    cum = np.concatenate([[0], np.cumsum(energy)])
+    starts = _slice_starts(seg_len, min_silence_len, seek_step)
+    ends = starts + min_silence_len
+    # 부족한 끝 프레임은 pydub처럼 무음으로 채운 것으로 간주 (분모는 요청 길이)
+    count = (bounds[ends] - bounds[starts]) * channels
+    rms = np.sqrt((cum[ends] - cum[starts]) / np.maximum(count, 1))
+    if amplitude > 1:
+        # 정수 PCM은 audioop.rms처럼 정수로 내림한 뒤 비교 (float 샘플은 그대로)
+        rms = np.floor(rms)
+    thresh = 10 ** (silence_thresh / 20) * amplitude
+    silent = starts[rms <= thresh]
+    if len(silent) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # 무음 시작 위치의 연속 구간 (run) 경계: 바로 다음 위치가 아니고 min_silence_len 보다 떨어진 곳
+    step = np.diff(silent)
+    breaks = np.flatnonzero((step != seek_step) & (step > min_silence_len))
+    run_starts = silent[np.concatenate([[0], breaks + 1])]
+    run_ends = silent[np.concatenate([breaks, [len(silent) - 1]])] + min_silence_len
+    return np.stack([run_starts, run_ends], axis=1)
+
+
+def nonsilent_from_silence(silent_ranges, seg_len):
+    # 무음 구간의 여집합 (pydub detect_nonsilent와 같은 경계 처리)
+    if len(silent_ranges) == 0:
+        return [[0, seg_len]]
+    if silent_ranges[0, 0] == 0 and silent_ranges[0, 1] == seg_len:
+        return []
+
+    ranges = np.stack(
+        [
+            np.concatenate([[0], silent_ranges[:, 1]]),
+            np.concatenate([silent_ranges[:, 0], [seg_len]]),
+        ],
+        axis=1,
+    )
+    if silent_ranges[-1, 1] == seg_len:
+        ranges = ranges[:-1]
+    if ranges[0, 0] == 0 and ranges[0, 1] == 0:
+        ranges = ranges[1:]
+    return ranges.tolist()
+
+
+def detect_nonsilent(
+    samples, frame_rate, min_silence_len=1000, silence_thresh=-16, seek_step=1, amplitude=None
+):
+    # 샘플 배열 ((프레임,) 또는 (프레임, 채널))에서 소리 구간 [[start_ms, end_ms], ...]
+    # pydub.silence.detect_nonsilent와 같은 결과를 Python 루프 없이 계산
+    samples = np.asarray(samples)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if amplitude is None:
+        amplitude = max_amplitude(samples.dtype)
+
+    energy = ms_energy(samples, frame_rate)
+    silent_ranges = detect_silence_energy(
+        energy,
+        frame_rate,
+        samples.shape[1],
+        min_silence_len,
+        silence_thresh,
+        amplitude,
+        seek_step,
+    )
+    return nonsilent_from_silence(silent_ranges, len(energy))
+
+
+def segment_samples(audio):
+    # AudioSegment 원본 데이터를 복사 없이 (프레임, 채널) 배열로 (pydub은 8bit도 부호 있는 값으로 계산)
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[audio.sample_width]
+    return np.frombuffer(audio.raw_data, dtype=dtype).reshape(-1, audio.channels)
+
+
+# 원본 오디오의 구간 (ms 단위, 데이터는 복사하지 않음)
+AudioSpan = namedtuple("AudioSpan", ["offset", "length"])
+
+
+def silence_between(non_silent_times, duration_ms):
+    # 소리 구간 사이의 무음 구간 (앞 / 뒤 포함)
+    edges = np.asarray(non_silent_times, dtype=np.int64).reshape(-1, 2)
+    starts = np.concatenate([[0], edges[:, 1]])
+    ends = np.concatenate([edges[:, 0], [duration_ms]])
+    keep = ends > starts
+    return np.stack([starts[keep], ends[keep]], axis=1)
+
+
+def snap_split_points(duration_ms, split_ms, silent_ranges, tolerance_ms):
+    # split_ms 마다 자르되, tolerance_ms 이내에 무음이 있으면 무음 안에서 자름
+    silent = np.asarray(silent_ranges, dtype=np.int64).reshape(-1, 2)
+    points = []
+    position = 0
+    while duration_ms - position > split_ms:
+        target = position + split_ms
+        if len(silent):
+            # 무음 구간에서 target에 가장 가까운 점 (안이면 target 그대로)
+            # 가운데가 tolerance_ms 이내면 가운데, 아니면 가까운 쪽 끝
+            nearest = np.clip(target, silent[:, 0], silent[:, 1])
+            middle = (silent[:, 0] + silent[:, 1]) // 2
+            use_middle = (nearest != target) & (np.abs(middle - target) <= tolerance_ms)
+            candidates = np.where(use_middle, middle, nearest)
+            distance = np.abs(candidates - target)
+            distance[candidates <= position] = np.iinfo(np.int64).max
+            best = int(np.argmin(distance))
+            if distance[best] <= tolerance_ms:
+                target = int(candidates[best])
+        points.append(target)
+        position = target
+    return points
+
+
+def pcm_samples(samples):
+    # float 샘플 (-1.0 ~ 1.0) 은 16bit 정수 PCM으로, 정수 샘플은 그대로
+    if np.issubdtype(samples.dtype, np.floating):
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    return samples
+
+
+def samples_to_segment(samples, frame_rate):
+    # (프레임, 채널) 샘플 배열 → AudioSegment
+    samples = pcm_samples(samples)
+    return AudioSegment(
+        data=np.ascontiguousarray(samples).tobytes(),
+        sample_width=samples.dtype.itemsize,
+        frame_rate=frame_rate,
+        channels=samples.shape[1] if samples.ndim == 2 else 1,
+    )
+
+
+def write_audio(samples, frame_rate, out_path, format="wav"):
+    # (프레임, 채널) 샘플 배열 → 오디오 파일 (wav는 wave 모듈, 그 외는 pydub export)
+    samples = pcm_samples(samples)
+    data = np.ascontiguousarray(samples).tobytes()
+    channels = samples.shape[1] if samples.ndim == 2 else 1
+    if format == "wav":
+        with wave.open(out_path, "wb") as f:
+            f.setnchannels(channels)
+            f.setsampwidth(samples.dtype.itemsize)
+            f.setframerate(frame_rate)
+            f.writeframes(data)
+    else:
+        samples_to_segment(samples, frame_rate).export(out_path, format=format)
+    return out_path
+
+
+def span_frames(offset, length, n_frames, frame_rate):
+    # ms 구간 → 프레임 구간 (끝까지 가는 구간은 1ms 미만 남는 프레임도 포함)
+    f0 = offset * frame_rate // 1000
+    if offset + length >= int(round(n_frames * 1000 / frame_rate)):
+        return f0, n_frames
+    return f0, (offset + length) * frame_rate // 1000
+
+
+def _export_span(source, offset, length, out_path, format):
+    # 프로세스 풀 작업: 원본 WAV를 다시 메모리 맵해서 구간만 저장
+    samples, frame_rate = open_wav_samples(source)
+    f0, f1 = span_frames(offset, length, len(samples), frame_rate)
+    return write_audio(samples[f0:f1], frame_rate, out_path, format)
+
+
 class AudioChunk:
-    def __init__(self, filepath, min_silence_len=350, silence_thresh=-35):
-        self.audio = AudioSegment.from_file(filepath, format="wav")
+    def __init__(
+        self,
+        filepath=None,
+        min_silence_len=350,
+        silence_thresh=-35,
+        streaming=False,
+        window_ms=60_000,
+        seek_step=1,
+        samples=None,
+        frame_rate=None,
+    ):
         self.filepath = filepath
         self.min_silence_len = min_silence_len
         self.silence_thresh = silence_thresh
-        self.detect_nonsilent_from_audio()
+        self.streaming = streaming
+        self.window_ms = window_ms
+        self.seek_step = seek_step
+        if samples is not None:
+            # 이미 디코딩된 PCM 배열 (파일 없이 바로 분석)
+            self.streaming = True
+            self.audio = None
+            self.samples = samples if samples.ndim == 2 else samples[:, None]
+            self.frame_rate = frame_rate
+            self.detect_nonsilent_streaming()
+        elif streaming:
+            # 전체를 AudioSegment로 읽지 않고 메모리 맵 + window 단위 에너지 계산
+            self.audio = None
+            self.samples, self.frame_rate = open_wav_samples(filepath)
+            self.detect_nonsilent_streaming()
+        else:
+            self.audio = AudioSegment.from_file(filepath, format="wav")
+            self.frame_rate = self.audio.frame_rate
+            self.detect_nonsilent_from_audio()
+
+    @classmethod
+    def from_media(cls, media_filepath, sample_rate=16000, audio_filepath=None, **kwargs):
+        # 영상 / 오디오 파일 → mono 16kHz PCM → AudioChunk
+        # audio_filepath를 주면 16kHz WAV로 저장 후 메모리 맵, 없으면 디스크에 쓰지 않음
+        if audio_filepath is not None:
+            extract_speech_audio(media_filepath, audio_filepath, sample_rate)
+            return cls(audio_filepath, streaming=True, **kwargs)
+
+        samples = decode_audio_array(media_filepath, sample_rate)
+        return cls(samples=samples, frame_rate=sample_rate, **kwargs)
+
+    def detect_nonsilent_streaming(self):
+        energy = ms_energy(self.samples, self.frame_rate, self.window_ms)
+        silent_ranges = detect_silence_energy(
+            energy,
+            self.frame_rate,
+            self.samples.shape[1],
+            self.min_silence_len,
+            self.silence_thresh,
+            max_amplitude(self.samples.dtype),
+            self.seek_step,
+        )
+        self.non_silent_times = nonsilent_from_silence(silent_ranges, len(energy))
+        print(f"분석에 사용할 전체 오디오 조각 개수: {len(self.non_silent_times)}")
+
+    def iter_chunks(self):
+        # (start, end, samples) 를 하나씩 생성 (ms 단위, samples는 (프레임, 채널) 배열)
+        for start, end in self.non_silent_times:
+            if self.streaming:
+                f0 = start * self.frame_rate // 1000
+                f1 = end * self.frame_rate // 1000
+                yield start, end, self.samples[f0:f1]
+            else:
+                segment = self.audio[start:end]
+                samples = np.array(segment.get_array_of_samples())
+                yield start, end, samples.reshape(-1, segment.channels)
 
     @staticmethod
     def make_audio_chunks(audio, non_silent_times):
@@ -99,26 +508,103 @@ class AudioChunk:
 
     def detect_nonsilent_from_audio(self):
         non_silent_audio_times = detect_nonsilent(
-            self.audio,
+            segment_samples(self.audio),
+            self.audio.frame_rate,
             min_silence_len=self.min_silence_len,
             silence_thresh=self.silence_thresh,
+            seek_step=self.seek_step,
+            amplitude=self.audio.max_possible_amplitude,
         )
 
-        non_silent_audios_output = AudioSegment.empty()
-
-        for i in range(len(non_silent_audio_times)):
-            non_silent_audios_output += self.audio[
-                non_silent_audio_times[i][0] : non_silent_audio_times[i][1]
-            ]
+        self.non_silent_times = non_silent_audio_times
         self.audio_chunks = self.make_audio_chunks(self.audio, non_silent_audio_times)
-        self.non_silent_audios_output = non_silent_audios_output
         print(f"분석에 사용할 전체 오디오 조각 개수: {len(non_silent_audio_times)}")
 
+    @property
+    def non_silent_audios_output(self):
+        # 무음을 제거한 전체 오디오 (+= 반복 대신 한 번에 이어 붙임)
+        if self.streaming:
+            # 메모리 맵 / PCM 배열: 소리 구간 샘플만 이어 붙임
+            chunks = [samples for _, _, samples in self.iter_chunks()]
+            if not chunks:
+                chunks = [self.samples[:0]]
+            return samples_to_segment(np.concatenate(chunks), self.frame_rate)
+        data = b"".join(chunk.raw_data for chunk, _, _ in self.audio_chunks)
+        return self.audio._spawn(data)
+
+    @property
+    def duration_ms(self):
+        if self.streaming:
+            return int(round(len(self.samples) * 1000 / self.frame_rate))
+        return len(self.audio)
+
+    @property
+    def frames(self):
+        # 전체 샘플 (프레임, 채널) 배열 (메모리 맵 또는 AudioSegment 데이터 뷰)
+        return self.samples if self.streaming else segment_samples(self.audio)
+
+    def span_samples(self, span):
+        frames = self.frames
+        f0, f1 = span_frames(span.offset, span.length, len(frames), self.frame_rate)
+        return frames[f0:f1]
+
+    def span_audio(self, span):
+        if not self.streaming:
+            return self.audio[span.offset : span.offset + span.length]
+        return samples_to_segment(self.span_samples(span), self.frame_rate)
+
     def audio_splits(self, split_time=100):
-        splits = int(self.audio.duration_seconds // split_time + 1)
+        splits = int(self.duration_ms / 1000 // split_time + 1)
         audios = []
         for s in range(splits):
             start = s * split_time * 1000
-            end = start + split_time * 1000
-            audios.append(self.audio[start:end])
+            audios.append(self.span_audio(AudioSpan(start, split_time * 1000)))
         return audios
+
+    def silence_splits(self, split_time=100, tolerance=5):
+        # split_time(초) 근처의 무음에서 자른 구간 목록 (tolerance초 이내에 무음이 없으면 그 위치에서 자름)
+        duration = self.duration_ms
+        points = snap_split_points(
+            duration,
+            split_time * 1000,
+            silence_between(self.non_silent_times, duration),
+            tolerance * 1000,
+        )
+        bounds = [0] + points + [duration]
+        return [
+            AudioSpan(start, end - start)
+            for start, end in zip(bounds[:-1], bounds[1:])
+            if end > start
+        ]
+
+    def export_splits(self, spans, out_dir, format="wav", max_workers=None, use_processes=False):
+        # 구간별 파일 저장 (스레드 풀, use_processes=True면 프로세스 풀에서 원본을 각자 메모리 맵)
+        if use_processes and self.filepath is None:
+            raise ValueError("use_processes=True는 WAV 파일로 만든 AudioChunk에서만 사용할 수 있습니다.")
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.filepath or "audio"))[0]
+        paths = [os.path.join(out_dir, f"{stem}_{i:04d}.{format}") for i in range(len(spans))]
+
+        if use_processes:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                return list(
+                    executor.map(
+                        _export_span,
+                        repeat(self.filepath),
+                        [span.offset for span in spans],
+                        [span.length for span in spans],
+                        paths,
+                        repeat(format),
+                    )
+                )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda span, path: write_audio(
+                        self.span_samples(span), self.frame_rate, path, format
+                    ),
+                    spans,
+                    paths,
+                )
+            )
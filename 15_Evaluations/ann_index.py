@@ -0,0 +1,221 @@
+"""
+ann_index.py
+========================================
+FAISS 인덱스 타입 설정 (근사 검색 / 양자화)
+- flat     : IndexFlatL2 (정확, 기본값)
+- ivf_flat : IVF + 원본 벡터
+- ivf_pq   : IVF + Product Quantization (메모리 최소)
+- hnsw     : HNSW 그래프 (학습 불필요, 삭제 불가)
+- sq8      : 8bit 스칼라 양자화 (메모리 1/4)
+- 검색 파라미터 (nprobe / efSearch) + flat 대비 recall 측정
+========================================
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8")
+
+
+class IndexConfig:
+    """
+    FAISS 인덱스 타입 / 파라미터
+
+    Parameters
+    ----------
+    index_type : str, optional
+        INDEX_TYPES 중 하나 (기본값: "flat")
+    nlist : int, optional
+        IVF 클러스터 수 (기본값: 4 * sqrt(N), 학습 데이터 39개/클러스터 이상 되도록 제한)
+    nprobe : int, optional
+        IVF 검색 시 탐색할 클러스터 수 (기본값: nlist / 16)
+    pq_m : int, optional
+        PQ 서브벡터 수 (차원의 약수, 기본값: 차원 / 16 이하 최대 약수)
+    hnsw_m : int, optional
+        HNSW 이웃 수 (기본값: 32)
+    ef_search : int, optional
+        HNSW 검색 후보 수 (기본값: 64)
+    train_size : int, optional
+        학습 샘플 최대 크기 (기본값: 64 * nlist)
+
+    Examples
+    --------
+    >>> config = IndexConfig("ivf_pq", nprobe=32)
+    >>> index = config.create(dim=1024, n_vectors=10_000_000)
+    """
+
+    def __init__(
+        self,
+        index_type: str = "flat",
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        pq_m: Optional[int] = None,
+        hnsw_m: int = 32,
+        ef_search: int = 64,
+        train_size: Optional[int] = None,
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"알 수 없는 index_type: {index_type} (가능: {INDEX_TYPES})")
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.train_size = train_size
+
+    def __repr__(self) -> str:
+        return f"IndexConfig({self.describe()})"
+
+    def describe(self) -> str:
+        """매니페스트 비교용 설정 문자열 (검색 파라미터 제외)"""
+        return f"{self.index_type}:nlist={self.nlist}:pq_m={self.pq_m}:hnsw_m={self.hnsw_m}"
+
+    @property
+    def needs_training(self) -> bool:
+        return self.index_type in ("ivf_flat", "ivf_pq", "sq8")
+
+    @property
+    def supports_delete(self) -> bool:
+        """
+        LangChain FAISS.delete를 써도 되는지
+
+        FAISS.delete는 remove_ids 뒤 남은 벡터 번호가 앞으로 당겨진다고 가정한다.
+        flat / sq8(연속 코드 배열)만 그렇게 동작하고, IVF는 번호를 그대로 두므로
+        docstore 매핑이 어긋난다. HNSW는 삭제 자체를 지원하지 않는다.
+        """
+        return self.index_type in ("flat", "sq8")
+
+    # ========================================
+    # 인덱스 생성 / 학습
+    # ========================================
+
+    def _nlist(self, n_vectors: int) -> int:
+        if self.nlist is not None:
+            return self.nlist
+        return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+    def _pq_m(self, dim: int) -> int:
+        if self.pq_m is not None:
+            return self.pq_m
+        target = max(1, dim // 16)
+        return max(m for m in range(1, target + 1) if dim % m == 0)
+
+    def training_size(self, n_vectors: int) -> int:
+        """학습에 쓸 샘플 수"""
+        if not self.needs_training:
+            return 0
+        if self.index_type == "sq8":
+            default = 100_000
+        else:
+            default = 64 * self._nlist(n_vectors)
+        return min(n_vectors, self.train_size or default)
+
+    def create(self, dim: int, n_vectors: int):
+        """
+        빈 인덱스 생성 (L2 거리, FAISS.from_documents 기본값과 동일)
+
+        Parameters
+        ----------
+        dim : int
+            벡터 차원
+        n_vectors : int
+            넣을 벡터 수 (nlist 기본값 계산용)
+        """
+        import faiss
+
+        if self.index_type == "flat":
+            return faiss.IndexFlatL2(dim)
+
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, self.hnsw_m)
+            self.apply_search_params(index)
+            return index
+
+        if self.index_type == "sq8":
+            return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+
+        nlist = self._nlist(n_vectors)
+        quantizer = faiss.IndexFlatL2(dim)
+        if self.index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_L2)
+        else:
+            # 코드북 하나(2^nbits)당 학습 벡터 39개 이상 되도록 nbits 제한
+            nbits = max(1, min(8, int(math.log2(max(2, self.training_size(n_vectors) // 39)))))
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, self._pq_m(dim), nbits)
+        self.apply_search_params(index)
+        return index
+
+    def train(self, index, sample: np.ndarray) -> None:
+        """학습이 필요한 인덱스면 샘플로 학습"""
+        if not index.is_trained:
+            index.train(np.ascontiguousarray(sample, dtype=np.float32))
+
+    def apply_search_params(self, index) -> None:
+        """
+        검색 파라미터 적용 (인덱스 로드 후에도 호출)
+
+        - IVF: nprobe
+        - HNSW: efSearch
+        """
+        import faiss
+
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = self.nprobe or max(1, ivf.nlist // 16)
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = self.ef_search
+
+
+class ExactTopK:
+    """
+    flat(정확) 검색 기준 상위 k를 window 단위로 누적 계산
+
+    전체 벡터를 보관하지 않고, 고정된 쿼리 벡터에 대해
+    window마다 거리 계산 → 상위 k 병합만 유지한다.
+    """
+
+    def __init__(self, queries: np.ndarray, k: int = 10):
+        self.queries = np.ascontiguousarray(queries, dtype=np.float32)
+        self.k = k
+        n = len(self.queries)
+        self.distances = np.full((n, 0), np.inf, dtype=np.float32)
+        self.labels = np.zeros((n, 0), dtype=np.int64)
+
+    def add(self, vectors: np.ndarray, offset: int) -> None:
+        """
+        Parameters
+        ----------
+        vectors : np.ndarray
+            인덱스에 추가되는 벡터 (window)
+        offset : int
+            window 첫 벡터의 인덱스 위치
+        """
+        # ||q - x||^2 = ||q||^2 - 2 q·x + ||x||^2
+        d = (
+            (self.queries ** 2).sum(axis=1, keepdims=True)
+            - 2.0 * self.queries @ vectors.T
+            + (vectors ** 2).sum(axis=1)[None, :]
+        )
+        labels = np.broadcast_to(np.arange(offset, offset + len(vectors)), d.shape)
+
+        distances = np.concatenate([self.distances, d], axis=1)
+        labels = np.concatenate([self.labels, labels], axis=1)
+        keep = min(self.k, distances.shape[1])
+        top = np.argpartition(distances, keep - 1, axis=1)[:, :keep]
+        self.distances = np.take_along_axis(distances, top, axis=1)
+        self.labels = np.take_along_axis(labels, top, axis=1)
+
+    def recall(self, index) -> float:
+        """인덱스 검색 결과의 recall@k (정확 상위 k 대비)"""
+        if len(self.queries) == 0 or self.labels.shape[1] == 0:
+            return 1.0
+        _, found = index.search(self.queries, self.k)
+        hits = sum(
+            len(set(row.tolist()) & set(exact.tolist()))
+            for row, exact in zip(found, self.labels)
+        )
+        return hits / self.labels.size
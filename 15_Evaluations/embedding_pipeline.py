@@ -0,0 +1,315 @@
+"""
+embedding_pipeline.py
+========================================
+CPU 임베딩 파이프라인 (청크 → FAISS)
+- 토큰 길이순 정렬로 배치 내 패딩 최소화
+- 배치 크기 조절 + sentence-transformers 멀티 프로세스 풀
+- window 단위로 임베딩 → 바로 FAISS 인덱스에 추가 (전체 벡터를 리스트로 들고 있지 않음)
+- IVF / PQ / HNSW / SQ8 인덱스 (무작위 샘플 학습, flat 대비 recall 측정)
+========================================
+"""
+
+import inspect
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from ann_index import ExactTopK, IndexConfig
+
+
+# 길이 정렬 시 한 번에 토큰화할 텍스트 수
+LENGTH_BATCH = 4096
+
+
+class EmbeddingPipeline:
+    """
+    청크 임베딩 파이프라인 (from_documents / add_documents 대체)
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        인코딩 배치 크기 (기본값: 32)
+    num_workers : int, optional
+        인코딩 프로세스 수 (기본값: 1 = 현재 프로세스)
+    window_size : int, optional
+        한 번에 임베딩해서 인덱스에 넣을 청크 수 (기본값: 4096)
+    index_config : IndexConfig, optional
+        인덱스 타입 / 파라미터 (기본값: flat)
+    check_recall : bool, optional
+        build 후 flat(정확) 검색 대비 recall@recall_k 측정 (기본값: False)
+    recall_k : int, optional
+        recall 측정 기준 k (기본값: 10)
+    recall_queries : int, optional
+        recall 측정용 쿼리 수 (무작위 청크, 기본값: 100)
+    seed : int, optional
+        학습 / 쿼리 샘플링 시드 (기본값: 0)
+
+    Examples
+    --------
+    >>> pipeline = EmbeddingPipeline(batch_size=64, num_workers=4)
+    >>> vectorstore = pipeline.build(chunks, embeddings, ids=chunk_ids)
+
+    >>> pipeline = EmbeddingPipeline(index_config=IndexConfig("ivf_pq", nprobe=16), check_recall=True)
+    >>> vectorstore = pipeline.build(chunks, embeddings)
+    >>> pipeline.last_recall   # 예: 0.93
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 32,
+        num_workers: int = 1,
+        window_size: int = 4096,
+        index_config: Optional[IndexConfig] = None,
+        check_recall: bool = False,
+        recall_k: int = 10,
+        recall_queries: int = 100,
+        seed: int = 0,
+    ):
+        self.batch_size = batch_size
+        self.num_workers = max(1, num_workers)
+        self.window_size = window_size
+        self.index_config = index_config or IndexConfig()
+        self.check_recall = check_recall
+        self.recall_k = recall_k
+        self.recall_queries = recall_queries
+        self.seed = seed
+        self.last_recall: Optional[float] = None
+
+    # ========================================
+    # FAISS 생성 / 추가
+    # ========================================
+
+    def build(
+        self,
+        documents: List[Document],
+        embeddings: Embeddings,
+        ids: Optional[List[str]] = None,
+    ) -> FAISS:
+        """
+        새 FAISS 벡터스토어 생성 (FAISS.from_documents 대체)
+
+        Parameters
+        ----------
+        documents : List[Document]
+            청크 목록
+        embeddings : Embeddings
+            임베딩 모델 (검색 시 쿼리 임베딩에도 사용)
+        ids : List[str], optional
+            청크 id (docstore id)
+
+        Returns
+        -------
+        FAISS
+            index_config 타입의 벡터스토어 (flat이면 from_documents 와 동일한 구성)
+        """
+        if not documents:
+            raise ValueError("임베딩할 청크가 없습니다.")
+
+        config = self.index_config
+        n = len(documents)
+        rng = np.random.default_rng(self.seed)
+
+        encoder = _Encoder(embeddings, self.batch_size, self.num_workers)
+        try:
+            # 학습 / recall 측정용 무작위 샘플을 먼저 임베딩 (길이순 window는 편향되므로)
+            n_train = config.training_size(n)
+            n_check = min(n, self.recall_queries) if self.check_recall else 0
+            sample = None
+            cached = None
+            if max(n_train, n_check):
+                picks = rng.choice(n, size=max(n_train, n_check), replace=False)
+                sample = encoder.encode([documents[i].page_content for i in picks.tolist()])
+                # 샘플 청크는 window에서 다시 임베딩하지 않음
+                cached = (picks, sample)
+
+            vectorstore = None
+            exact = None
+            for texts, vectors, metadatas, window_ids in self._windows(
+                documents, encoder, ids, cached
+            ):
+                if vectorstore is None:
+                    # 첫 window의 차원으로 인덱스 생성
+                    index = config.create(vectors.shape[1], n)
+                    if n_train:
+                        config.train(index, sample[:n_train])
+                    if n_check:
+                        exact = ExactTopK(sample[:n_check], self.recall_k)
+                    vectorstore = FAISS(
+                        embedding_function=embeddings,
+                        index=index,
+                        docstore=InMemoryDocstore(),
+                        index_to_docstore_id={},
+                    )
+                if exact is not None:
+                    exact.add(vectors, vectorstore.index.ntotal)
+                vectorstore.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=window_ids)
+        finally:
+            encoder.close()
+
+        if exact is not None:
+            self.last_recall = exact.recall(vectorstore.index)
+            print(
+                f"✅ recall@{self.recall_k} ({config.index_type} vs flat, "
+                f"{n_check}개 쿼리): {self.last_recall:.4f}"
+            )
+        return vectorstore
+
+    def add(
+        self,
+        vectorstore: FAISS,
+        documents: List[Document],
+        ids: Optional[List[str]] = None,
+    ) -> None:
+        """기존 FAISS 벡터스토어에 청크 추가 (add_documents 대체, 학습된 인덱스 그대로 사용)"""
+        encoder = _Encoder(vectorstore.embeddings, self.batch_size, self.num_workers)
+        try:
+            for texts, vectors, metadatas, window_ids in self._windows(documents, encoder, ids):
+                vectorstore.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=window_ids)
+        finally:
+            encoder.close()
+
+    def iter_windows(
+        self,
+        documents: List[Document],
+        embeddings: Embeddings,
+        ids: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[dict], Optional[List[str]]]]:
+        """FAISS 외 저장소용: 길이순 window 단위 (texts, vectors, metadatas, ids)"""
+        encoder = _Encoder(embeddings, self.batch_size, self.num_workers)
+        try:
+            yield from self._windows(documents, encoder, ids)
+        finally:
+            encoder.close()
+
+    def _windows(
+        self,
+        documents: List[Document],
+        encoder: "_Encoder",
+        ids: Optional[List[str]],
+        cached: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[dict], Optional[List[str]]]]:
+        """
+        길이순으로 정렬한 뒤 window_size 개씩 임베딩
+
+        Parameters
+        ----------
+        cached : (np.ndarray, np.ndarray), optional
+            이미 임베딩한 (문서 위치, 벡터) - 해당 청크는 다시 인코딩하지 않음
+
+        Yields
+        ------
+        (texts, vectors, metadatas, ids)
+            window 하나 (인덱스에 추가하고 나면 버려짐)
+        """
+        if not documents:
+            return
+
+        texts = [doc.page_content for doc in documents]
+        order = encoder.length_order(texts)
+
+        # 문서 위치 → cached 벡터 행 (-1이면 새로 인코딩)
+        cached_rows = np.full(len(texts), -1, dtype=np.int64)
+        if cached is not None:
+            cached_rows[cached[0]] = np.arange(len(cached[0]))
+
+        for start in range(0, len(order), self.window_size):
+            window = order[start:start + self.window_size].tolist()
+            window_texts = [texts[i] for i in window]
+            rows = cached_rows[window]
+            hit = rows >= 0
+            if not hit.any():
+                vectors = encoder.encode(window_texts)
+            else:
+                vectors = np.empty((len(window), cached[1].shape[1]), dtype=np.float32)
+                vectors[hit] = cached[1][rows[hit]]
+                misses = np.flatnonzero(~hit).tolist()
+                if misses:
+                    vectors[misses] = encoder.encode([window_texts[i] for i in misses])
+            yield (
+                window_texts,
+                vectors,
+                [documents[i].metadata for i in window],
+                [ids[i] for i in window] if ids is not None else None,
+            )
+
+
+class _Encoder:
+    """
+    텍스트 → 벡터 (float32 배열)
+
+    HuggingFaceEmbeddings면 내부 SentenceTransformer를 직접 사용하고,
+    그 외 Embeddings는 embed_documents를 배치 단위로 호출한다.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int, num_workers: int):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.client = getattr(embeddings, "_client", None)
+
+        # HuggingFaceEmbeddings의 encode 설정 (정규화 등) 유지, 배치 크기만 교체
+        self.encode_kwargs = dict(getattr(embeddings, "encode_kwargs", None) or {})
+        self.encode_kwargs["batch_size"] = batch_size
+
+        self.pool = None
+        if self.client is not None and num_workers > 1:
+            self.pool = self.client.start_multi_process_pool(
+                target_devices=["cpu"] * num_workers
+            )
+
+    def length_order(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        긴 텍스트부터의 순서 (토크나이저가 있으면 토큰 수, 없으면 글자 수 기준)
+
+        토큰 수는 LENGTH_BATCH개씩 세어 int64 배열에 바로 기록한다.
+        (전체 코퍼스의 input_ids 리스트를 한꺼번에 만들지 않음)
+        """
+        tokenizer = getattr(self.client, "tokenizer", None)
+        if tokenizer is None:
+            lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+            return np.argsort(-lengths, kind="stable")
+
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for start in range(0, len(texts), LENGTH_BATCH):
+            batch = list(texts[start:start + LENGTH_BATCH])
+            lengths[start:start + len(batch)] = tokenizer(
+                batch,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_length=True,
+            )["length"]
+        return np.argsort(-lengths, kind="stable")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self.client is None:
+            batches = (
+                self.embeddings.embed_documents(texts[start:start + self.batch_size])
+                for start in range(0, len(texts), self.batch_size)
+            )
+            return np.asarray([v for batch in batches for v in batch], dtype=np.float32)
+
+        if self.pool is None:
+            vectors = self.client.encode(texts, **self.encode_kwargs)
+        else:
+            # 프로세스마다 비슷한 크기의 조각을 나눠 인코딩
+            chunk_size = max(self.batch_size, -(-len(texts) // self.num_workers))
+            if hasattr(self.client, "encode_multi_process"):
+                # encode_multi_process가 받는 encode 설정(normalize_embeddings, prompt 등)은 그대로 전달
+                accepted = inspect.signature(self.client.encode_multi_process).parameters
+                kwargs = {k: v for k, v in self.encode_kwargs.items() if k in accepted}
+                kwargs["chunk_size"] = chunk_size
+                vectors = self.client.encode_multi_process(texts, self.pool, **kwargs)
+            else:
+                vectors = self.client.encode(
+                    texts, pool=self.pool, chunk_size=chunk_size, **self.encode_kwargs
+                )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.client.stop_multi_process_pool(self.pool)
+            self.pool = None
@@ -0,0 +1,59 @@
+"""
+embedding_registry.py
+========================================
+프로세스 전역 임베딩 모델 레지스트리
+- (모델 이름, 디바이스, 정규화 여부)별 HuggingFaceEmbeddings 한 번만 로드
+- 여러 PDFRAG 인스턴스가 같은 모델 객체를 공유
+========================================
+"""
+
+import threading
+from typing import Dict, Tuple
+
+from langchain_huggingface import HuggingFaceEmbeddings
+
+
+_lock = threading.Lock()
+_models: Dict[Tuple[str, str, bool], HuggingFaceEmbeddings] = {}
+
+
+def get_embeddings(
+    model_name: str,
+    device: str = "cpu",
+    normalize: bool = True,
+) -> HuggingFaceEmbeddings:
+    """
+    공유 임베딩 모델 반환 (처음 요청할 때 로드)
+
+    Parameters
+    ----------
+    model_name : str
+        HuggingFace 모델 이름 (예: "BAAI/bge-m3")
+    device : str, optional
+        실행 디바이스 (기본값: "cpu")
+    normalize : bool, optional
+        임베딩 정규화 여부 (기본값: True)
+
+    Returns
+    -------
+    HuggingFaceEmbeddings
+        같은 설정이면 항상 같은 객체
+    """
+    key = (model_name, device, normalize)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={"device": device},
+                encode_kwargs={"normalize_embeddings": normalize},
+            )
+            _models[key] = model
+            print(f"✅ 임베딩 모델 로드: {model_name}")
+    return model
+
+
+def clear_embeddings() -> None:
+    """로드된 모델 모두 해제"""
+    with _lock:
+        _models.clear()
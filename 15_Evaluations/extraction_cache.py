@@ -0,0 +1,225 @@
+"""
+extraction_cache.py
+========================================
+문서 로더 추출 결과 캐시
+- 파일 내용 해시 + 로더 이름 + 로더 버전 + 로더 옵션 기반 키
+- 페이지 텍스트 / 메타데이터를 gzip JSON 파일 하나로 저장
+- 내용이 바뀐 파일만 다시 추출
+- 실패 / 백업 방법(PrvText) 추출 결과는 저장하지 않음 (다음 호출에서 다시 시도)
+========================================
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+
+# 기본 캐시 위치: 이 파일 옆의 .cache/extraction
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "extraction"
+)
+
+# 추출 결과에 영향을 주는 백엔드 패키지 (로더 클래스 이름 → 패키지)
+_BACKENDS = {
+    "PyMuPDFLoader": "pymupdf",
+    "PDFPlumberLoader": "pdfplumber",
+    "PyPDFLoader": "pypdf",
+}
+
+# 파일 경로가 들어가는 메타데이터 키 (캐시 적중 시 현재 경로로 교체)
+_PATH_KEYS = ("source", "file_path")
+
+# 추출 결과와 무관한 로더 속성 (캐시 키에서 제외)
+_IGNORED_PARAMS = {"file_path", "web_path", "headers", "verbose", "parser"}
+
+# 백업 추출 방법 (원래 방법이 실패했다는 뜻이므로 저장하지 않음)
+_FALLBACK_METHODS = {"prvtext"}
+
+# 캐시 항목 형식 버전 (저장 형식이 바뀌면 올려서 이전 항목 무효화)
+CACHE_VERSION = 2
+
+
+def _package_version(package: str) -> str:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class ExtractionCache:
+    """
+    내용 주소 기반 추출 캐시
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        캐시 디렉토리 (기본값: DEFAULT_CACHE_DIR)
+
+    Examples
+    --------
+    >>> cache = ExtractionCache()
+    >>> docs = cache.load(PyMuPDFLoader("data/report.pdf"))   # 첫 호출: 추출 후 저장
+    >>> docs = cache.load(PyMuPDFLoader("data/report.pdf"))   # 이후: 파일이 같으면 캐시
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def file_digest(file_path: str, block_size: int = 1 << 20) -> str:
+        """파일 내용 해시 (blake2b)"""
+        h = hashlib.blake2b(digest_size=20)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    @staticmethod
+    def loader_version(loader) -> str:
+        """
+        로더 버전 문자열
+
+        로더에 VERSION 속성이 있으면 그 값, 없으면 로더 패키지 버전
+        (+ 알려진 파싱 백엔드 버전)
+        """
+        own = getattr(loader, "VERSION", None)
+        if own is not None:
+            return str(own)
+
+        module = type(loader).__module__
+        parts = [_package_version(module.split(".")[0].replace("_", "-"))]
+        backend = _BACKENDS.get(type(loader).__name__)
+        if backend:
+            parts.append(f"{backend}={_package_version(backend)}")
+        return ";".join(parts)
+
+    @staticmethod
+    def loader_params(loader) -> str:
+        """
+        로더 옵션 문자열 (로더 + parser 속성, 정렬된 JSON)
+
+        mode, extract_tables 같은 옵션이 바뀌면 다른 키가 되도록 한다.
+        JSON으로 바꿀 수 없는 값(이미지 파서 객체 등)은 클래스 이름만 사용.
+        """
+        params = {}
+        for prefix, obj in (("", loader), ("parser.", getattr(loader, "parser", None))):
+            for name, value in getattr(obj, "__dict__", {}).items():
+                if name.startswith("_") or name in _IGNORED_PARAMS:
+                    continue
+                params[prefix + name] = value
+        return json.dumps(params, sort_keys=True, default=lambda v: type(v).__qualname__)
+
+    @staticmethod
+    def is_cacheable(docs: List[Document]) -> bool:
+        """
+        저장해도 되는 추출 결과인지
+
+        빈 결과, 오류 메타데이터가 있는 Document, 백업 방법(PrvText) 결과는
+        일시적인 실패일 수 있으므로 저장하지 않는다.
+        """
+        return bool(docs) and not any(
+            "error" in doc.metadata
+            or doc.metadata.get("extraction_method") in _FALLBACK_METHODS
+            for doc in docs
+        )
+
+    def key(
+        self, digest: str, loader_name: str, loader_version: str, loader_params: str = ""
+    ) -> str:
+        """캐시 키 (파일 이름으로 사용)"""
+        raw = "\0".join(
+            [str(CACHE_VERSION), digest, loader_name, loader_version, loader_params]
+        ).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def get(self, key: str, file_path: str) -> Optional[List[Document]]:
+        """
+        캐시 조회
+
+        Returns
+        -------
+        List[Document] or None
+            캐시에 없으면 None (경로 메타데이터는 file_path로 교체)
+        """
+        entry = self._entry_path(key)
+        try:
+            with gzip.open(entry, "rt", encoding="utf-8") as f:
+                pages = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        docs = []
+        for text, metadata in pages:
+            for path_key in _PATH_KEYS:
+                if path_key in metadata:
+                    metadata[path_key] = file_path
+            docs.append(Document(page_content=text, metadata=metadata))
+        return docs
+
+    def put(self, key: str, docs: List[Document]) -> None:
+        """캐시 저장 (임시 파일에 쓴 뒤 교체 → 중간에 끊겨도 깨진 항목 없음)"""
+        entry = self._entry_path(key)
+        directory = os.path.dirname(entry)
+        os.makedirs(directory, exist_ok=True)
+
+        pages = [[doc.page_content, doc.metadata] for doc in docs]
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(pages, ensure_ascii=False, default=str).encode("utf-8"))
+            os.replace(tmp_path, entry)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(
+        self,
+        loader,
+        file_path: Optional[str] = None,
+        loader_version: Optional[str] = None,
+    ) -> List[Document]:
+        """
+        캐시를 거쳐 로더 실행
+
+        Parameters
+        ----------
+        loader : BaseLoader
+            file_path 속성이 있는 로더 (PyMuPDFLoader, CustomHWPLoader 등)
+        file_path : str, optional
+            원본 파일 경로 (기본값: loader.file_path)
+        loader_version : str, optional
+            로더 버전 (기본값: loader_version(loader))
+
+        Returns
+        -------
+        List[Document]
+            추출된 문서
+        """
+        file_path = str(file_path or loader.file_path)
+        loader_name = f"{type(loader).__module__}.{type(loader).__qualname__}"
+        key = self.key(
+            self.file_digest(file_path),
+            loader_name,
+            loader_version or self.loader_version(loader),
+            self.loader_params(loader),
+        )
+
+        docs = self.get(key, file_path)
+        if docs is not None:
+            print(f"✅ 추출 캐시 사용: {os.path.basename(file_path)}")
+            return docs
+
+        docs = loader.load()
+        if self.is_cacheable(docs):
+            self.put(key, docs)
+        return docs
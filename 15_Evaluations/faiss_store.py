@@ -0,0 +1,265 @@
+"""
+faiss_store.py
+========================================
+디스크에 저장되는 증분 FAISS 인덱스
+- 인덱스 + 청크 매니페스트 저장 / 로드
+- 청크 내용 해시 기반 증분 갱신 (새 청크만 임베딩, 사라진 청크 삭제)
+- 메타데이터만 바뀐 청크는 다시 임베딩하지 않고 docstore만 갱신
+- 버전 디렉토리 + CURRENT 포인터 교체로 원자적 저장
+========================================
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from ann_index import IndexConfig
+from embedding_pipeline import EmbeddingPipeline
+
+
+# 기본 인덱스 위치: 이 파일 옆의 .cache/faiss
+DEFAULT_INDEX_ROOT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "faiss"
+)
+
+MANIFEST_NAME = "manifest.json"
+CURRENT_NAME = "CURRENT"
+
+# 청크 id에 넣는 메타데이터 (total_pages, moddate 같은 파일 단위 값은 제외)
+CHUNK_ID_KEYS = ("source", "page")
+
+
+def chunk_id(doc: Document) -> str:
+    """
+    청크 id = 내용 + 위치(source, page) 해시
+
+    다른 메타데이터(total_pages, moddate 등)가 바뀌어도 같은 id이므로
+    파일을 다시 저장해도 벡터를 재사용한다.
+    """
+    location = [doc.metadata.get(key) for key in CHUNK_ID_KEYS]
+    h = hashlib.sha1()
+    h.update(doc.page_content.encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps(location, ensure_ascii=False, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def embedding_name(embeddings: Embeddings) -> str:
+    """임베딩 모델 식별 문자열 (매니페스트 비교용)"""
+    name = getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None)
+    return f"{type(embeddings).__name__}:{name}"
+
+
+def default_index_dir(source_path: str, *config) -> str:
+    """
+    원본 파일 + 설정(청크 크기, 임베딩 모델 등)별 기본 인덱스 디렉토리
+
+    Examples
+    --------
+    >>> default_index_dir("data/report.pdf", "BAAI/bge-m3", 300, 50)
+    '.../.cache/faiss/report-1a2b3c4d5e6f'
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    raw = json.dumps([os.path.abspath(source_path), *config], default=str)
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(DEFAULT_INDEX_ROOT, f"{stem}-{digest}")
+
+
+class PersistentFAISS:
+    """
+    증분 갱신되는 FAISS 인덱스 (디렉토리 하나)
+
+    index_dir/
+        CURRENT              ← 현재 버전 디렉토리 이름 (원자적으로 교체)
+        v-xxxx/index.faiss
+        v-xxxx/index.pkl
+        v-xxxx/manifest.json ← 임베딩 모델, 청크 id 목록
+
+    Parameters
+    ----------
+    index_dir : str
+        인덱스 디렉토리
+
+    Examples
+    --------
+    >>> store = PersistentFAISS(".cache/faiss/report")
+    >>> vectorstore = store.sync(chunks, embeddings)   # 바뀐 청크만 임베딩
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+
+    # ========================================
+    # 저장 / 로드
+    # ========================================
+
+    def _current_dir(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.index_dir, CURRENT_NAME), encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+        path = os.path.join(self.index_dir, name)
+        return path if os.path.isdir(path) else None
+
+    def load(
+        self,
+        embeddings: Embeddings,
+        index_config: Optional[IndexConfig] = None,
+    ) -> Tuple[Optional[FAISS], Dict]:
+        """
+        저장된 인덱스 로드
+
+        Returns
+        -------
+        (FAISS or None, manifest)
+            저장된 인덱스가 없거나 임베딩 모델 / 인덱스 타입이 다르면 (None, {})
+        """
+        current = self._current_dir()
+        if current is None:
+            return None, {}
+
+        try:
+            with open(os.path.join(current, MANIFEST_NAME), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+
+        if manifest.get("embedding") != embedding_name(embeddings):
+            print("⚠️  임베딩 모델이 달라 인덱스를 새로 만듭니다")
+            return None, {}
+
+        if index_config is not None and manifest.get("index", "flat") != index_config.describe():
+            print("⚠️  인덱스 타입이 달라 인덱스를 새로 만듭니다")
+            return None, {}
+
+        # 직접 저장한 파일만 읽으므로 pickle 역직렬화 허용
+        vectorstore = FAISS.load_local(
+            current, embeddings, allow_dangerous_deserialization=True
+        )
+        if index_config is not None:
+            # nprobe / efSearch는 저장되지 않으므로 다시 적용
+            index_config.apply_search_params(vectorstore.index)
+        return vectorstore, manifest
+
+    def save(
+        self,
+        vectorstore: FAISS,
+        embeddings: Embeddings,
+        index_config: Optional[IndexConfig] = None,
+    ) -> None:
+        """
+        새 버전 디렉토리에 저장 후 CURRENT 교체 (이전 버전은 삭제)
+
+        저장 도중 중단되어도 CURRENT는 이전의 완전한 버전을 가리킨다.
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        previous = self._current_dir()
+
+        version_dir = tempfile.mkdtemp(prefix="v-", dir=self.index_dir)
+        vectorstore.save_local(version_dir)
+        manifest = {
+            "embedding": embedding_name(embeddings),
+            "index": (index_config or IndexConfig()).describe(),
+            "chunk_ids": list(vectorstore.index_to_docstore_id.values()),
+        }
+        with open(os.path.join(version_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(version_dir))
+        os.replace(tmp_path, os.path.join(self.index_dir, CURRENT_NAME))
+
+        if previous is not None and previous != version_dir:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    # ========================================
+    # 증분 갱신
+    # ========================================
+
+    def sync(
+        self,
+        documents: List[Document],
+        embeddings: Embeddings,
+        pipeline: Optional[EmbeddingPipeline] = None,
+    ) -> FAISS:
+        """
+        청크 목록과 인덱스를 일치시킴
+
+        - 인덱스에 없는 청크만 임베딩해서 추가
+        - 청크 목록에서 사라진 벡터는 삭제
+        - 메타데이터만 바뀐 청크는 docstore만 교체 (다시 임베딩하지 않음)
+        - 바뀐 것이 있을 때만 저장
+
+        Parameters
+        ----------
+        documents : List[Document]
+            현재 청크 목록
+        embeddings : Embeddings
+            임베딩 모델
+        pipeline : EmbeddingPipeline, optional
+            새 청크 임베딩 파이프라인 (기본값: EmbeddingPipeline())
+
+        Returns
+        -------
+        FAISS
+            갱신된 벡터스토어
+        """
+        # 청크 id (같은 청크가 여러 번 나오면 한 번만)
+        chunks: Dict[str, Document] = {}
+        for doc in documents:
+            chunks.setdefault(chunk_id(doc), doc)
+
+        pipeline = pipeline or EmbeddingPipeline()
+        config = pipeline.index_config
+        vectorstore, _ = self.load(embeddings, config)
+
+        existing = set(vectorstore.index_to_docstore_id.values()) if vectorstore else set()
+        stale_ids = [cid for cid in existing if cid not in chunks]
+        if stale_ids and not config.supports_delete:
+            # HNSW / IVF는 FAISS.delete로 지울 수 없으므로 새로 생성
+            print(f"⚠️  {config.index_type} 인덱스는 삭제를 지원하지 않아 새로 만듭니다")
+            vectorstore = None
+
+        if vectorstore is None:
+            if not chunks:
+                raise ValueError("인덱스를 만들 청크가 없습니다.")
+            vectorstore = pipeline.build(
+                list(chunks.values()), embeddings, ids=list(chunks.keys())
+            )
+            print(f"✅ FAISS 인덱스 생성: {len(chunks)}개 청크 임베딩 ({config.index_type})")
+            self.save(vectorstore, embeddings, config)
+            return vectorstore
+
+        new_ids = [cid for cid in chunks if cid not in existing]
+        updated = {
+            cid: Document(id=cid, page_content=chunks[cid].page_content, metadata=chunks[cid].metadata)
+            for cid in existing
+            if cid in chunks and vectorstore.docstore.search(cid).metadata != chunks[cid].metadata
+        }
+
+        if not new_ids and not stale_ids and not updated:
+            print(f"✅ FAISS 인덱스 로드: {len(existing)}개 청크 (변경 없음)")
+            return vectorstore
+
+        if updated:
+            vectorstore.docstore.delete(list(updated))
+            vectorstore.docstore.add(updated)
+        if stale_ids:
+            vectorstore.delete(stale_ids)
+        if new_ids:
+            pipeline.add(vectorstore, [chunks[cid] for cid in new_ids], ids=new_ids)
+        print(
+            f"✅ FAISS 인덱스 갱신: +{len(new_ids)} 임베딩, -{len(stale_ids)} 삭제, "
+            f"메타데이터 {len(updated)} 갱신 (재사용 {len(existing) - len(stale_ids)})"
+        )
+        self.save(vectorstore, embeddings, config)
+        return vectorstore
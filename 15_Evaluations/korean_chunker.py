@@ -0,0 +1,218 @@
+"""
+korean_chunker.py
+========================================
+한국어 문장 경계 기반 청크 분할 (RecursiveCharacterTextSplitter 대체)
+- Kiwi split_into_sents로 문장 경계 검출 (여러 페이지를 한 번에 배치 처리)
+- 길이는 토큰 수 기준 (Kiwi 형태소 또는 임베딩 모델 토크나이저)
+- 문장 토큰 수 누적합 + searchsorted로 한 번에 청크 구간 결정 (재귀 재분할 없음)
+- 청크 크기보다 긴 문장만 토큰 경계에서 잘라냄
+========================================
+"""
+
+import copy
+import threading
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from kiwipiepy import Kiwi
+from langchain_core.documents import Document
+from langchain_text_splitters import TextSplitter
+
+
+_kiwi_lock = threading.Lock()
+_kiwi: Optional[Kiwi] = None
+
+
+def get_kiwi() -> Kiwi:
+    """공유 Kiwi 인스턴스 (모델 로드는 한 번만)"""
+    global _kiwi
+    with _kiwi_lock:
+        if _kiwi is None:
+            _kiwi = Kiwi()
+        return _kiwi
+
+
+# 문자 구간 (start, end) 과 토큰 수
+Segment = Tuple[int, int, int]
+
+
+def pack_segments(counts: np.ndarray, chunk_size: int, chunk_overlap: int) -> List[Tuple[int, int]]:
+    """
+    세그먼트 토큰 수 → 청크별 세그먼트 구간 [i, j)
+
+    각 청크는 chunk_size 토큰 이하로 최대한 채우고, 다음 청크는
+    직전 청크 끝에서 chunk_overlap 토큰 이내의 세그먼트부터 시작한다.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        세그먼트별 토큰 수 (각각 chunk_size 이하)
+    chunk_size : int
+        청크 최대 토큰 수
+    chunk_overlap : int
+        청크 간 최대 겹침 토큰 수
+    """
+    n = len(counts)
+    cum = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+    spans = []
+    i = 0
+    while i < n:
+        j = int(np.searchsorted(cum, cum[i] + chunk_size, side="right")) - 1
+        j = max(j, i + 1)
+        spans.append((i, j))
+        if j >= n:
+            break
+        # 겹침: 끝에서 chunk_overlap 토큰 이내로 들어오는 첫 세그먼트 (항상 전진)
+        overlap_start = int(np.searchsorted(cum, cum[j] - chunk_overlap, side="left"))
+        i = max(overlap_start, i + 1)
+    return spans
+
+
+class KoreanSentenceSplitter(TextSplitter):
+    """
+    Kiwi 문장 분리 + 토큰 길이 기반 청크 분할
+
+    Parameters
+    ----------
+    chunk_size : int, optional
+        청크 최대 토큰 수 (기본값: 300)
+    chunk_overlap : int, optional
+        청크 간 겹침 토큰 수 (기본값: 50)
+    tokenizer : PreTrainedTokenizerFast, optional
+        길이를 셀 토크나이저 (예: 임베딩 모델 토크나이저, 기본값: Kiwi 형태소 수)
+    kiwi : Kiwi, optional
+        문장 분리기 (기본값: 공유 인스턴스)
+    batch_size : int, optional
+        split_documents에서 한 번에 처리할 페이지 수 (기본값: 64)
+    **kwargs
+        TextSplitter 옵션 (add_start_index, strip_whitespace 등)
+
+    Examples
+    --------
+    >>> splitter = KoreanSentenceSplitter(chunk_size=200, chunk_overlap=30)
+    >>> chunks = splitter.split_documents(pages)   # 페이지 전체를 배치로 처리
+
+    >>> # 임베딩 모델 토큰 수 기준
+    >>> splitter = KoreanSentenceSplitter(chunk_size=256, tokenizer=embeddings._client.tokenizer)
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 300,
+        chunk_overlap: int = 50,
+        tokenizer: Any = None,
+        kiwi: Optional[Kiwi] = None,
+        batch_size: int = 64,
+        **kwargs: Any,
+    ):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self.tokenizer = tokenizer
+        self.kiwi = kiwi
+        self.batch_size = batch_size
+
+    # ========================================
+    # 세그먼트 (문장 / 긴 문장 조각)
+    # ========================================
+
+    def _segments_kiwi(self, sents) -> List[Segment]:
+        """Kiwi 형태소 수 기준 세그먼트"""
+        segments = []
+        for sent in sents:
+            tokens = sent.tokens
+            if len(tokens) <= self._chunk_size:
+                segments.append((sent.start, sent.end, len(tokens)))
+                continue
+            # 긴 문장: 형태소 경계에서 chunk_size개씩
+            for k in range(0, len(tokens), self._chunk_size):
+                piece = tokens[k:k + self._chunk_size]
+                segments.append((piece[0].start, piece[-1].start + piece[-1].len, len(piece)))
+        return segments
+
+    def _segments_tokenizer(self, text: str, sents, counts: Sequence[int]) -> List[Segment]:
+        """토크나이저 토큰 수 기준 세그먼트"""
+        segments = []
+        for sent, count in zip(sents, counts):
+            if count <= self._chunk_size:
+                segments.append((sent.start, sent.end, count))
+                continue
+            # 긴 문장: 오프셋 매핑으로 토큰 경계에서 chunk_size개씩
+            offsets = self.tokenizer(
+                text[sent.start:sent.end],
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+            )["offset_mapping"]
+            for k in range(0, len(offsets), self._chunk_size):
+                piece = offsets[k:k + self._chunk_size]
+                segments.append((sent.start + piece[0][0], sent.start + piece[-1][1], len(piece)))
+        return segments
+
+    def _iter_segments(self, texts: List[str]) -> Iterator[List[Segment]]:
+        """텍스트 배치 → 텍스트별 세그먼트 목록"""
+        kiwi = self.kiwi or get_kiwi()
+        use_kiwi_tokens = self.tokenizer is None
+        all_sents = list(kiwi.split_into_sents(texts, return_tokens=use_kiwi_tokens))
+
+        if use_kiwi_tokens:
+            for sents in all_sents:
+                yield self._segments_kiwi(sents)
+            return
+
+        # 배치 안의 모든 문장을 토크나이저 한 번으로 계산
+        flat = [text[s.start:s.end] for text, sents in zip(texts, all_sents) for s in sents]
+        input_ids = self.tokenizer(flat, add_special_tokens=False)["input_ids"] if flat else []
+        counts = [len(ids) for ids in input_ids]
+        position = 0
+        for text, sents in zip(texts, all_sents):
+            yield self._segments_tokenizer(text, sents, counts[position:position + len(sents)])
+            position += len(sents)
+
+    # ========================================
+    # 분할
+    # ========================================
+
+    def _chunk_spans(self, segments: List[Segment]) -> List[Tuple[int, int]]:
+        """세그먼트 → 청크 문자 구간"""
+        if not segments:
+            return []
+        seg = np.asarray(segments, dtype=np.int64)
+        return [
+            (int(seg[i, 0]), int(seg[j - 1, 1]))
+            for i, j in pack_segments(seg[:, 2], self._chunk_size, self._chunk_overlap)
+        ]
+
+    def _iter_chunks(self, texts: Iterable[str]) -> Iterator[List[Tuple[int, str]]]:
+        """텍스트마다 (시작 위치, 청크 텍스트) 목록 (batch_size개씩 Kiwi에 전달)"""
+        texts = iter(texts)
+        while True:
+            batch = list(islice(texts, self.batch_size))
+            if not batch:
+                return
+            for text, segments in zip(batch, self._iter_segments(batch)):
+                chunks = []
+                for start, end in self._chunk_spans(segments):
+                    chunk = text[start:end]
+                    if self._strip_whitespace:
+                        stripped = chunk.lstrip()
+                        start += len(chunk) - len(stripped)
+                        chunk = stripped.rstrip()
+                    if chunk:
+                        chunks.append((start, chunk))
+                yield chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for _, chunk in next(self._iter_chunks([text]))]
+
+    def create_documents(
+        self, texts: List[str], metadatas: Optional[List[dict]] = None
+    ) -> List[Document]:
+        """여러 텍스트(페이지)를 배치로 분할 (split_documents도 이 경로 사용)"""
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for metadata, chunks in zip(metadatas, self._iter_chunks(texts)):
+            for start, chunk in chunks:
+                chunk_metadata = copy.deepcopy(metadata)
+                if self._add_start_index:
+                    chunk_metadata["start_index"] = start
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents
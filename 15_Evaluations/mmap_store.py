@@ -0,0 +1,431 @@
+"""
+mmap_store.py
+========================================
+메모리 맵 벡터스토어 (FAISS + pickle docstore 대체)
+- 벡터: vectors.npy (float32, np.load(mmap_mode="r"))
+- 청크: records.bin (UTF-8 JSON 연속 저장) + offsets.npy (레코드 시작 위치)
+- 청크 id: ids.npy (고정 폭 bytes, mmap) → 매니페스트에는 스칼라 값만
+- 로드 시 역직렬화 없음 → 여러 워커 프로세스가 페이지 캐시 하나를 공유
+- 청크 해시 기반 갱신 (바뀌지 않은 청크의 벡터는 복사해서 재사용)
+- 읽기 전용: 추가 / 삭제는 build / sync로 새 버전을 작성
+========================================
+"""
+
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+from embedding_pipeline import EmbeddingPipeline
+from faiss_store import CURRENT_NAME, MANIFEST_NAME, chunk_id, embedding_name
+
+
+VECTORS_NAME = "vectors.npy"
+NORMS_NAME = "norms.npy"
+RECORDS_NAME = "records.bin"
+OFFSETS_NAME = "offsets.npy"
+IDS_NAME = "ids.npy"
+
+# 검색 시 한 번에 거리 계산할 벡터 수
+SEARCH_BLOCK = 65536
+
+
+def _current_dir(store_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(store_dir, CURRENT_NAME), encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(store_dir, name)
+    return path if os.path.isdir(path) else None
+
+
+class _Writer:
+    """버전 디렉토리 하나에 벡터 / 레코드를 순서대로 기록"""
+
+    def __init__(self, version_dir: str, count: int):
+        self.version_dir = version_dir
+        self.count = count
+        self.row = 0
+        self.vectors = None
+        self.norms = np.empty(count, dtype=np.float32)
+        self.offsets = np.zeros(count + 1, dtype=np.int64)
+        self.ids: List[str] = []
+        self.records = open(os.path.join(version_dir, RECORDS_NAME), "wb")
+
+    def write(
+        self,
+        vectors: np.ndarray,
+        texts: List[str],
+        metadatas: List[dict],
+        ids: List[str],
+    ) -> None:
+        if self.vectors is None:
+            # 첫 window에서 차원이 정해지면 파일 크기만큼 미리 할당
+            self.vectors = np.lib.format.open_memmap(
+                os.path.join(self.version_dir, VECTORS_NAME),
+                mode="w+",
+                dtype=np.float32,
+                shape=(self.count, vectors.shape[1]),
+            )
+        end = self.row + len(vectors)
+        self.vectors[self.row:end] = vectors
+        self.norms[self.row:end] = np.einsum("ij,ij->i", vectors, vectors)
+
+        position = int(self.offsets[self.row])
+        for i, (text, metadata) in enumerate(zip(texts, metadatas), start=self.row + 1):
+            raw = json.dumps([text, metadata], ensure_ascii=False, default=str).encode("utf-8")
+            self.records.write(raw)
+            position += len(raw)
+            self.offsets[i] = position
+        self.ids.extend(ids)
+        self.row = end
+
+    def close(self, embeddings: Embeddings) -> None:
+        self.records.close()
+        self.vectors.flush()
+        del self.vectors
+        np.save(os.path.join(self.version_dir, NORMS_NAME), self.norms)
+        np.save(os.path.join(self.version_dir, OFFSETS_NAME), self.offsets)
+        # 고정 폭 bytes 배열 (로드 시 JSON 파싱 없이 mmap)
+        ids = np.array([cid.encode("utf-8") for cid in self.ids], dtype=np.bytes_)
+        np.save(os.path.join(self.version_dir, IDS_NAME), ids)
+        manifest = {
+            "embedding": embedding_name(embeddings),
+            "count": self.count,
+        }
+        with open(os.path.join(self.version_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+
+class MmapVectorStore(VectorStore):
+    """
+    메모리 맵 기반 읽기 전용 벡터스토어 (정확 L2 검색, FAISS IndexFlatL2와 같은 점수)
+
+    add_texts / add_documents는 지원하지 않는다 (TypeError).
+    청크가 바뀌면 build / sync로 새 버전을 작성한다.
+
+    store_dir/
+        CURRENT              ← 현재 버전 디렉토리 이름 (원자적으로 교체)
+        v-xxxx/vectors.npy   ← (N, dim) float32
+        v-xxxx/norms.npy     ← 벡터 제곱 노름 (검색 시 재계산 방지)
+        v-xxxx/records.bin   ← [text, metadata] JSON 연속 저장
+        v-xxxx/offsets.npy   ← 레코드 i = records[offsets[i]:offsets[i + 1]]
+        v-xxxx/ids.npy       ← 청크 id (고정 폭 bytes)
+        v-xxxx/manifest.json ← 임베딩 모델, 청크 수
+
+    Parameters
+    ----------
+    store_dir : str
+        저장 디렉토리 (build / sync로 생성)
+    embeddings : Embeddings
+        쿼리 임베딩 모델
+
+    Examples
+    --------
+    >>> store = MmapVectorStore.sync(".cache/mmap/report", chunks, embeddings)
+    >>> retriever = store.as_retriever(search_kwargs={"k": 5})
+
+    >>> # 다른 프로세스: 파일만 열어서 바로 검색 (같은 페이지 캐시 공유)
+    >>> store = MmapVectorStore(".cache/mmap/report", embeddings)
+    """
+
+    def __init__(self, store_dir: str, embeddings: Embeddings):
+        current = _current_dir(store_dir)
+        if current is None:
+            raise FileNotFoundError(f"저장된 벡터스토어가 없습니다: {store_dir}")
+
+        self.store_dir = store_dir
+        self.version_dir = current
+        self.embedding = embeddings
+
+        with open(os.path.join(current, MANIFEST_NAME), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        # 청크 id: 고정 폭 bytes 배열 (문자열은 rows / _document에서 디코딩)
+        self.ids = np.load(os.path.join(current, IDS_NAME), mmap_mode="r")
+        self._rows: Optional[Dict[str, int]] = None
+
+        self.vectors = np.load(os.path.join(current, VECTORS_NAME), mmap_mode="r")
+        self.norms = np.load(os.path.join(current, NORMS_NAME), mmap_mode="r")
+        self.offsets = np.load(os.path.join(current, OFFSETS_NAME), mmap_mode="r")
+        with open(os.path.join(current, RECORDS_NAME), "rb") as f:
+            self.records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        """청크 id → 행 번호 (처음 필요할 때 생성)"""
+        if self._rows is None:
+            self._rows = {cid.decode("utf-8"): i for i, cid in enumerate(self.ids.tolist())}
+        return self._rows
+
+    def _document(self, row: int) -> Document:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        text, metadata = json.loads(self.records[start:end])
+        return Document(id=self.ids[row].decode("utf-8"), page_content=text, metadata=metadata)
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        return [self._document(self.rows[cid]) for cid in ids if cid in self.rows]
+
+    # ========================================
+    # 검색
+    # ========================================
+
+    def _top_rows(self, embedding: List[float], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """정확 L2 상위 k (블록 단위 거리 계산, 가까운 순)"""
+        query = np.asarray(embedding, dtype=np.float32)
+        qq = float(query @ query)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_dist = np.empty(0, dtype=np.float32)
+
+        for start in range(0, len(self.ids), SEARCH_BLOCK):
+            block = self.vectors[start:start + SEARCH_BLOCK]
+            # ||x - q||^2 = ||x||^2 - 2 x·q + ||q||^2
+            dist = self.norms[start:start + len(block)] - 2.0 * (block @ query) + qq
+            rows = np.concatenate([best_rows, np.arange(start, start + len(block))])
+            dist = np.concatenate([best_dist, dist])
+            if len(dist) > k:
+                keep = np.argpartition(dist, k - 1)[:k]
+                rows, dist = rows[keep], dist[keep]
+            best_rows, best_dist = rows, dist
+
+        order = np.argsort(best_dist, kind="stable")
+        return best_rows[order], np.maximum(best_dist[order], 0.0)
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        """
+        벡터로 검색 (점수 = L2 제곱 거리, 작을수록 가까움)
+
+        filter가 있으면 fetch_k개를 먼저 찾은 뒤 메타데이터가 일치하는 것만 남긴다.
+        """
+        if len(self.ids) == 0 or k <= 0:
+            return []
+        rows, dist = self._top_rows(embedding, max(k, fetch_k) if filter else k)
+
+        results = []
+        for row, d in zip(rows.tolist(), dist.tolist()):
+            doc = self._document(row)
+            if filter and any(doc.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            results.append((doc, d))
+            if len(results) == k:
+                break
+        return results
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(
+            self.embedding.embed_query(query), k, filter=filter, fetch_k=fetch_k
+        )
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any,
+    ) -> List[Document]:
+        query_vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        rows, _ = self._top_rows(query_vector, fetch_k)
+        picks = maximal_marginal_relevance(
+            query_vector, np.asarray(self.vectors[rows]), k=k, lambda_mult=lambda_mult
+        )
+        return [self._document(int(rows[i])) for i in picks]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # FAISS(L2)와 같은 관련도 변환
+        return self._euclidean_relevance_score_fn
+
+    # ========================================
+    # 생성 / 갱신
+    # ========================================
+
+    @classmethod
+    def build(
+        cls,
+        store_dir: str,
+        documents: List[Document],
+        embeddings: Embeddings,
+        ids: Optional[List[str]] = None,
+        pipeline: Optional[EmbeddingPipeline] = None,
+        previous: Optional["MmapVectorStore"] = None,
+    ) -> "MmapVectorStore":
+        """
+        새 버전 작성 후 CURRENT 교체 (이전 버전 삭제)
+
+        이미 열려 있는 이전 버전의 mmap은 파일이 삭제되어도 계속 유효하다.
+
+        Parameters
+        ----------
+        store_dir : str
+            저장 디렉토리
+        documents : List[Document]
+            청크 목록
+        embeddings : Embeddings
+            임베딩 모델
+        ids : List[str], optional
+            청크 id (기본값: chunk_id(doc))
+        pipeline : EmbeddingPipeline, optional
+            임베딩 파이프라인 (기본값: EmbeddingPipeline())
+        previous : MmapVectorStore, optional
+            같은 모델의 이전 버전 (같은 id의 벡터는 다시 임베딩하지 않음)
+        """
+        if not documents:
+            raise ValueError("저장할 청크가 없습니다.")
+        ids = list(ids) if ids is not None else [chunk_id(doc) for doc in documents]
+        pipeline = pipeline or EmbeddingPipeline()
+
+        reused = [i for i, cid in enumerate(ids) if previous is not None and cid in previous.rows]
+        reused_set = set(reused)
+        fresh = [i for i in range(len(ids)) if i not in reused_set]
+
+        os.makedirs(store_dir, exist_ok=True)
+        old_dir = _current_dir(store_dir)
+        version_dir = tempfile.mkdtemp(prefix="v-", dir=store_dir)
+        try:
+            writer = _Writer(version_dir, len(ids))
+            for start in range(0, len(reused), pipeline.window_size):
+                window = reused[start:start + pipeline.window_size]
+                rows = [previous.rows[ids[i]] for i in window]
+                writer.write(
+                    np.asarray(previous.vectors[rows], dtype=np.float32),
+                    [documents[i].page_content for i in window],
+                    [documents[i].metadata for i in window],
+                    [ids[i] for i in window],
+                )
+            for texts, vectors, metadatas, window_ids in pipeline.iter_windows(
+                [documents[i] for i in fresh], embeddings, [ids[i] for i in fresh]
+            ):
+                writer.write(vectors, texts, metadatas, window_ids)
+            writer.close(embeddings)
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+        fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(version_dir))
+        os.replace(tmp_path, os.path.join(store_dir, CURRENT_NAME))
+
+        if old_dir is not None and old_dir != version_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+        print(f"✅ mmap 벡터스토어 저장: {len(ids)}개 청크 (임베딩 {len(fresh)}, 재사용 {len(reused)})")
+        return cls(store_dir, embeddings)
+
+    @classmethod
+    def sync(
+        cls,
+        store_dir: str,
+        documents: List[Document],
+        embeddings: Embeddings,
+        pipeline: Optional[EmbeddingPipeline] = None,
+    ) -> "MmapVectorStore":
+        """
+        청크 목록이 같으면 저장된 파일을 그대로 열고, 다르면 새 버전 작성
+
+        메타데이터만 바뀐 경우에도 새 버전을 쓰지만 벡터는 모두 재사용한다.
+
+        Returns
+        -------
+        MmapVectorStore
+            현재 청크 목록과 일치하는 벡터스토어
+        """
+        # 청크 id (같은 청크가 여러 번 나오면 한 번만)
+        chunks: Dict[str, Document] = {}
+        for doc in documents:
+            chunks.setdefault(chunk_id(doc), doc)
+
+        def metadata_changed(store: "MmapVectorStore") -> bool:
+            # 저장된 레코드와 같은 JSON 변환 후 비교
+            return any(
+                doc.metadata != json.loads(json.dumps(chunks[doc.id].metadata, default=str))
+                for doc in store.get_by_ids(list(chunks))
+            )
+
+        previous = None
+        if _current_dir(store_dir) is not None:
+            try:
+                previous = cls(store_dir, embeddings)
+            except FileNotFoundError:
+                # ids.npy가 없는 이전 형식
+                print("⚠️  저장 형식이 달라 벡터스토어를 새로 만듭니다")
+        if previous is not None:
+            if previous.manifest.get("embedding") != embedding_name(embeddings):
+                print("⚠️  임베딩 모델이 달라 벡터스토어를 새로 만듭니다")
+                previous = None
+            elif set(previous.rows) == set(chunks) and not metadata_changed(previous):
+                print(f"✅ mmap 벡터스토어 로드: {len(previous)}개 청크 (변경 없음)")
+                return previous
+
+        return cls.build(
+            store_dir,
+            list(chunks.values()),
+            embeddings,
+            ids=list(chunks.keys()),
+            pipeline=pipeline,
+            previous=previous,
+        )
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        store_dir: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "MmapVectorStore":
+        if store_dir is None:
+            raise ValueError("MmapVectorStore는 store_dir가 필요합니다.")
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
+        return cls.build(store_dir, documents, embedding, ids=ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        raise TypeError(
+            "MmapVectorStore는 읽기 전용입니다. MmapVectorStore.build / sync로 새 버전을 만드세요."
+        )
@@ -9,13 +9,19 @@ RAG (Retrieval-Augmented Generation) 시스템 구현
 ========================================
 """
 
+import threading
+from typing import Optional
+
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.prompts import PromptTemplate
-from langchain_huggingface import HuggingFaceEmbeddings
+
+from embedding_registry import get_embeddings
+from extraction_cache import DEFAULT_CACHE_DIR, ExtractionCache
+from faiss_store import PersistentFAISS, default_index_dir
 
 
 class PDFRAG:
@@ -32,6 +38,12 @@ class PDFRAG:
         HuggingFace 임베딩 모델 이름
         기본값: "all-MiniLM-L6-v2"
         대안: "BAAI/bge-small-en-v1.5"
+    cache_dir : str, optional
+        PDF 추출 캐시 디렉토리 (None이면 캐시 사용 안 함)
+    persist_index : bool, optional
+        FAISS 인덱스 저장 / 증분 갱신 여부 (기본값: True)
+    index_dir : str, optional
+        FAISS 인덱스 디렉토리 (기본값: PDF / 모델별 .cache/faiss 하위)
     """
     
     def __init__(
@@ -39,33 +51,82 @@ class PDFRAG:
         pdf_path: str,
         llm,
         embedding_model_name: str = "all-MiniLM-L6-v2",
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        persist_index: bool = True,
+        index_dir: Optional[str] = None,
     ):
+        """
+        설정만 저장 (문서 로드 / 임베딩 모델 / 벡터스토어는 처음 필요할 때 생성)
+        """
         self.pdf_path = pdf_path
         self.llm = llm
         self.embedding_model_name = embedding_model_name
-        self.docs = None
-        self.split_documents = None
-        self.vectorstore = None
+        self.cache_dir = cache_dir
+        self.persist_index = persist_index
+        self.index_dir = index_dir
         self.retriever = None
         self.chain = None
         
-        # 문서 로드
-        self._load_documents()
-        
-        # 문서 분할
-        self._split_documents()
-        
-        # 임베딩 생성
-        self._create_embeddings()
+        # 단계별 결과 (처음 접근할 때 생성 후 재사용)
+        self._docs = None
+        self._chunks = None
+        self._embeddings = None
+        self._vectorstore = None
+        self._lock = threading.RLock()
+    
+    # ========================================
+    # 지연 생성 단계
+    # ========================================
+    
+    def _stage(self, name: str, build):
+        """name 속성이 비어 있으면 build()로 한 번만 생성"""
+        with self._lock:
+            if getattr(self, name) is None:
+                setattr(self, name, build())
+            return getattr(self, name)
+    
+    @property
+    def docs(self):
+        """PDF 페이지 Document 리스트"""
+        return self._stage("_docs", self._load_documents)
+    
+    @property
+    def split_documents(self):
+        """분할된 청크 리스트"""
+        return self._stage("_chunks", self._split_documents)
+    
+    @property
+    def embeddings(self):
+        """임베딩 모델 (같은 모델은 프로세스 전체에서 공유)"""
+        return self._stage("_embeddings", self._create_embeddings)
+    
+    @property
+    def vectorstore(self):
+        """FAISS 벡터스토어"""
+        return self._stage("_vectorstore", self._create_vectorstore)
+    
+    def warmup(self):
+        """
+        모든 단계를 미리 실행 (첫 질문 지연 방지)
         
-        # 벡터스토어 생성
-        self._create_vectorstore()
+        Returns
+        -------
+        PDFRAG
+            자기 자신
+        """
+        self.vectorstore
+        return self
     
     def _load_documents(self):
         """PDF 문서 로드"""
         loader = PyMuPDFLoader(self.pdf_path)
-        self.docs = loader.load()
-        print(f"✅ 문서 로드 완료: {len(self.docs)}개 페이지")
+        if self.cache_dir is not None:
+            # 파일 내용이 같으면 다시 파싱하지 않음
+            docs = ExtractionCache(self.cache_dir).load(loader)
+        else:
+            docs = loader.load()
+        print(f"✅ 문서 로드 완료: {len(docs)}개 페이지")
+        return docs
     
     def _split_documents(self):
         """문서 분할"""
@@ -73,25 +134,31 @@ class PDFRAG:
             chunk_size=500,                             # 더 작게 설정 
             chunk_overlap=50
         )
-        self.split_documents = text_splitter.split_documents(self.docs)
-        print(f"✅ 문서 분할 완료: {len(self.split_documents)}개 청크")
+        chunks = text_splitter.split_documents(self.docs)
+        print(f"✅ 문서 분할 완료: {len(chunks)}개 청크")
+        return chunks
     
     def _create_embeddings(self):
-        """HuggingFace 임베딩 생성"""
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=self.embedding_model_name,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        print(f"✅ 임베딩 모델 로드: {self.embedding_model_name}")
+        """HuggingFace 임베딩 (공유 레지스트리)"""
+        return get_embeddings(self.embedding_model_name, device="cpu")
     
     def _create_vectorstore(self):
-        """FAISS 벡터스토어 생성"""
-        self.vectorstore = FAISS.from_documents(
-            documents=self.split_documents,
-            embedding=self.embeddings
-        )
+        """FAISS 벡터스토어 생성 (저장된 인덱스가 있으면 바뀐 청크만 임베딩)"""
+        if self.persist_index:
+            # 모듈마다 청크 설정이 다르므로 모듈 이름도 디렉토리 키에 포함
+            index_dir = self.index_dir or default_index_dir(
+                self.pdf_path, self.embedding_model_name, __name__
+            )
+            vectorstore = PersistentFAISS(index_dir).sync(
+                self.split_documents, self.embeddings
+            )
+        else:
+            vectorstore = FAISS.from_documents(
+                documents=self.split_documents,
+                embedding=self.embeddings
+            )
         print(f"✅ 벡터스토어 생성 완료")
+        return vectorstore
     
     def create_retriever(self):
         """
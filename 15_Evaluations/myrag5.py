@@ -1,18 +1,43 @@
 # myrag5.py
 
+import threading
+
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.prompts import PromptTemplate
-from langchain_huggingface import HuggingFaceEmbeddings
+
+from ann_index import IndexConfig
+from embedding_pipeline import EmbeddingPipeline
+from embedding_registry import get_embeddings
+from extraction_cache import DEFAULT_CACHE_DIR, ExtractionCache
+from faiss_store import PersistentFAISS, default_index_dir
+from korean_chunker import KoreanSentenceSplitter
+from mmap_store import MmapVectorStore
 
 
 class PDFRAG:
-    def __init__(self, pdf_path, llm, chunk_size=300, chunk_overlap=50):
+    def __init__(
+        self,
+        pdf_path,
+        llm,
+        chunk_size=300,
+        chunk_overlap=50,
+        cache_dir=DEFAULT_CACHE_DIR,
+        persist_index=True,
+        index_dir=None,
+        embed_batch_size=32,
+        embed_workers=1,
+        index_type="flat",
+        nprobe=None,
+        ef_search=64,
+        check_recall=False,
+        vector_store="faiss",
+        splitter="recursive",
+    ):
         """
-        PDF RAG 시스템 초기화
+        PDF RAG 시스템 초기화 (설정만 저장, 각 단계는 처음 필요할 때 실행)
         
         Parameters
         ----------
@@ -21,50 +46,163 @@ class PDFRAG:
         llm : ChatOpenAI
             사용할 LLM
         chunk_size : int
-            청크 크기 (기본값: 300)
+            청크 크기 (기본값: 300, splitter="korean"이면 임베딩 모델 토큰 수)
         chunk_overlap : int
             청크 오버랩 (기본값: 50)
+        cache_dir : str or None
+            PDF 추출 캐시 디렉토리 (None이면 캐시 사용 안 함)
+        persist_index : bool
+            FAISS 인덱스 저장 / 증분 갱신 여부 (기본값: True)
+        index_dir : str or None
+            FAISS 인덱스 디렉토리 (기본값: PDF / 모델 / 청크 설정별 .cache/faiss 하위)
+        embed_batch_size : int
+            임베딩 배치 크기 (기본값: 32)
+        embed_workers : int
+            임베딩 프로세스 수 (기본값: 1)
+        index_type : str
+            FAISS 인덱스 타입 - flat / ivf_flat / ivf_pq / hnsw / sq8 (기본값: flat)
+        nprobe : int or None
+            IVF 검색 클러스터 수 (기본값: nlist / 16)
+        ef_search : int
+            HNSW 검색 후보 수 (기본값: 64)
+        check_recall : bool
+            인덱스 생성 후 flat 대비 recall@10 출력 (기본값: False)
+        vector_store : str
+            "faiss" 또는 "mmap" (벡터 / 청크를 읽기 전용 mmap 파일로 두고 프로세스 간 공유, 기본값: faiss)
+        splitter : str
+            "recursive" (RecursiveCharacterTextSplitter) 또는 "korean" (Kiwi 문장 경계, 기본값: recursive)
         """
         self.pdf_path = pdf_path
         self.llm = llm
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.documents = None
-        self.vectorstore = None
+        self.cache_dir = cache_dir
+        self.persist_index = persist_index
+        self.index_dir = index_dir
+        if vector_store not in ("faiss", "mmap"):
+            raise ValueError(f"알 수 없는 vector_store: {vector_store}")
+        self.vector_store = vector_store
+        if splitter not in ("recursive", "korean"):
+            raise ValueError(f"알 수 없는 splitter: {splitter}")
+        self.splitter = splitter
+        self.index_config = IndexConfig(index_type, nprobe=nprobe, ef_search=ef_search)
+        self.pipeline = EmbeddingPipeline(
+            batch_size=embed_batch_size,
+            num_workers=embed_workers,
+            index_config=self.index_config,
+            check_recall=check_recall,
+        )
         self.retriever = None
         
-        # 초기화
-        self._load_and_process()
+        # 단계별 결과 (처음 접근할 때 생성 후 재사용)
+        self._pages = None
+        self._documents = None
+        self._embeddings = None
+        self._vectorstore = None
+        self._lock = threading.RLock()
+    
+    # ========================================
+    # 지연 생성 단계
+    # ========================================
+    
+    def _stage(self, name, build):
+        """name 속성이 비어 있으면 build()로 한 번만 생성"""
+        with self._lock:
+            if getattr(self, name) is None:
+                setattr(self, name, build())
+            return getattr(self, name)
+    
+    @property
+    def pages(self):
+        """PDF 페이지 Document 리스트"""
+        return self._stage("_pages", self._load_pages)
+    
+    @property
+    def documents(self):
+        """분할된 청크 리스트"""
+        return self._stage("_documents", self._split_pages)
+    
+    @property
+    def embeddings(self):
+        """임베딩 모델 (같은 모델은 프로세스 전체에서 공유)"""
+        return self._stage("_embeddings", self._load_embeddings)
+    
+    @property
+    def vectorstore(self):
+        """FAISS 벡터스토어"""
+        return self._stage("_vectorstore", self._build_vectorstore)
+    
+    def warmup(self):
+        """
+        모든 단계를 미리 실행 (첫 질문 지연 방지)
+        
+        Returns
+        -------
+        PDFRAG
+            자기 자신
+        """
+        self.vectorstore
+        return self
     
-    def _load_and_process(self):
-        """PDF 로드 및 처리"""
-        # 1. PDF 로드
+    def _load_pages(self):
+        """1. PDF 로드"""
         loader = PyMuPDFLoader(self.pdf_path)
-        docs = loader.load()
+        if self.cache_dir is not None:
+            # 파일 내용이 같으면 다시 파싱하지 않음
+            docs = ExtractionCache(self.cache_dir).load(loader)
+        else:
+            docs = loader.load()
         print(f"✅ PDF 로드 완료: {len(docs)} 페이지")
-        
-        # 2. 청크 분할
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap
-        )
-        self.documents = text_splitter.split_documents(docs)
-        print(f"✅ 청크 분할 완료: {len(self.documents)} 청크 (크기={self.chunk_size}, 오버랩={self.chunk_overlap})")
-        
-        # 3. 임베딩
-        embeddings = HuggingFaceEmbeddings(
-            model_name="BAAI/bge-m3",
-            model_kwargs={"device": "cpu"},
-            encode_kwargs={"normalize_embeddings": True},
-        )
-        print(f"✅ 임베딩 모델 로드 완료: {embeddings.model_name}")
-        
-        # 4. 벡터스토어 생성
-        self.vectorstore = FAISS.from_documents(
-            documents=self.documents,
-            embedding=embeddings
-        )
-        print(f"✅ 벡터스토어 생성 완료: FAISS")
+        return docs
+    
+    def _split_pages(self):
+        """2. 청크 분할"""
+        if self.splitter == "korean":
+            # 문장 경계에서 자르고 길이는 임베딩 모델 토큰 수로 계산
+            client = getattr(self.embeddings, "_client", None)
+            text_splitter = KoreanSentenceSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                tokenizer=getattr(client, "tokenizer", None),
+            )
+        else:
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap
+            )
+        documents = text_splitter.split_documents(self.pages)
+        print(f"✅ 청크 분할 완료: {len(documents)} 청크 (크기={self.chunk_size}, 오버랩={self.chunk_overlap})")
+        return documents
+    
+    def _load_embeddings(self):
+        """3. 임베딩 (공유 레지스트리)"""
+        return get_embeddings("BAAI/bge-m3", device="cpu")
+    
+    def _build_vectorstore(self):
+        """4. 벡터스토어 생성 (저장된 인덱스가 있으면 바뀐 청크만 임베딩)"""
+        embeddings = self.embeddings
+        if self.vector_store == "mmap":
+            # 파일만 열면 되므로 워커 프로세스마다 역직렬화하지 않음 (정확 검색)
+            store_dir = self.index_dir or default_index_dir(
+                self.pdf_path, embeddings.model_name, self.chunk_size, self.chunk_overlap, "mmap"
+            )
+            vectorstore = MmapVectorStore.sync(
+                store_dir, self.documents, embeddings, pipeline=self.pipeline
+            )
+            print(f"✅ 벡터스토어 생성 완료: mmap")
+            return vectorstore
+        if self.persist_index:
+            index_dir = self.index_dir or default_index_dir(
+                self.pdf_path, embeddings.model_name, self.chunk_size, self.chunk_overlap,
+                self.index_config.index_type,
+            )
+            vectorstore = PersistentFAISS(index_dir).sync(
+                self.documents, embeddings, pipeline=self.pipeline
+            )
+        else:
+            vectorstore = self.pipeline.build(self.documents, embeddings)
+        print(f"✅ 벡터스토어 생성 완료: FAISS ({self.index_config.index_type})")
+        return vectorstore
     
     def create_retriever(self, k=10, search_type="similarity"):
         """
@@ -0,0 +1,36 @@
+# 15_Evaluations/tests/test_faiss_store.py - 인덱스 타입별 증분 삭제 후 검색
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from ann_index import IndexConfig
+from embedding_pipeline import EmbeddingPipeline
+from faiss_store import PersistentFAISS
+
+
+def _chunks(n):
+    return [Document(f"chunk {i}", metadata={"source": "a.pdf", "page": i}) for i in range(n)]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "sq8", "ivf_flat"])
+def test_delete_then_search_returns_matching_chunk(tmp_path, index_type):
+    embeddings = DeterministicFakeEmbedding(size=32)
+    # nprobe = nlist → IVF도 정확 검색이 되어 매핑 오류만 드러남
+    config = IndexConfig(index_type, nlist=8, nprobe=8)
+    store = PersistentFAISS(str(tmp_path))
+
+    store.sync(_chunks(400), embeddings, EmbeddingPipeline(index_config=config))
+    kept = [doc for i, doc in enumerate(_chunks(400)) if i % 3]
+    vectorstore = store.sync(kept, embeddings, EmbeddingPipeline(index_config=config))
+
+    assert vectorstore.index.ntotal == len(kept)
+    for doc in kept[::17]:
+        vector = embeddings.embed_query(doc.page_content)
+        top, = vectorstore.similarity_search_by_vector(vector, k=1)
+        assert top.page_content == doc.page_content
@@ -4,85 +4,189 @@
 """ OpenAI 모델 설정 함수
 - gpt-5-nano / gpt-5-mini
 - text-embedding-3-small / text-embedding-3-large
+- 클라이언트는 처음 사용할 때 생성 (import 시 생성하지 않음)
+- (provider, model, base_url) 별 1개만 생성 + 같은 프록시는 HTTP 연결 풀 공유
 """
 
 import os
+import threading
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 # 환경변수 로드
 load_dotenv()
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━
-# 전역 변수: LLM 설정 (프록시 기반)
+# 모델 설정 (프록시 기반)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-# GPT-5-nano 기본 설정 (프록시 경유)
-gpt_5_nano = ChatOpenAI(
-    api_key=os.getenv("GPT5_NANO_API_KEY"),
-    base_url=os.getenv("GPT5_NANO_BASE_URL"),
-    model=os.getenv("GPT5_NANO_MODEL", "openai/gpt-5-nano"),
-    #temperature=0.7
-)
-
-# GPT-5-mini 설정 (프록시 경유)
-gpt_5_mini = ChatOpenAI(
-    api_key=os.getenv("GPT5_MINI_API_KEY"),
-    base_url=os.getenv("GPT5_MINI_BASE_URL"),
-    model=os.getenv("GPT5_MINI_MODEL", "openai/gpt-5-mini"),
-    #temperature=0.7
-)
+# 이름 → 환경변수 접두사 + 기본 모델 (API 키 / 프록시 주소는 접두사_API_KEY / 접두사_BASE_URL)
+LLM_MODELS = {
+    "gpt-5-nano": ("GPT5_NANO", "openai/gpt-5-nano"),   # 기본 LLM
+    "gpt-5-mini": ("GPT5_MINI", "openai/gpt-5-mini"),
+}
+
+EMBEDDING_MODELS = {
+    "text-embedding-3-small": ("EMBEDDING", "text-embedding-3-small"),   # 기본 임베딩
+    "text-embedding-3-large": ("EMBEDDING_LARGE", "text-embedding-3-large"),
+}
+
+DEFAULT_LLM = "gpt-5-nano"
+DEFAULT_EMBEDDING = "text-embedding-3-small"
+
+# 짧은 이름 / 기존 전역 변수 이름
+_ALIASES = {
+    "nano": "gpt-5-nano",
+    "gpt_5_nano": "gpt-5-nano",
+    "mini": "gpt-5-mini",
+    "gpt_5_mini": "gpt-5-mini",
+    "small": "text-embedding-3-small",
+    "embeddings": "text-embedding-3-small",
+    "large": "text-embedding-3-large",
+    "embeddings_large": "text-embedding-3-large",
+}
+
+# 기존 전역 변수 (from config import gpt_5_nano 등) → 모델 이름
+_LEGACY_GLOBALS = {
+    "gpt_5_nano": ("llm", "gpt-5-nano"),
+    "gpt_5_mini": ("llm", "gpt-5-mini"),
+    "embeddings": ("embeddings", "text-embedding-3-small"),
+    "embeddings_large": ("embeddings", "text-embedding-3-large"),
+}
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━
-# 전역 변수: Embeddings 설정 (프록시 기반)
+# 클라이언트 레지스트리 (지연 생성)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-embeddings = OpenAIEmbeddings(
-    api_key=os.getenv("EMBEDDING_API_KEY"),
-    base_url=os.getenv("EMBEDDING_BASE_URL"),
-    model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
-)
+_lock = threading.Lock()
+_clients = {}        # (provider, model, base_url) → ChatOpenAI / OpenAIEmbeddings
+_http_clients = {}   # base_url → httpx.Client (같은 프록시는 연결 풀 공유)
+
+
+def _resolve(model, models, default):
+    """
+    모델 이름 → (환경변수 접두사, 실제 모델 이름)
+
+    - 등록된 이름 / 짧은 이름 ("mini", "large" 등)
+    - 환경변수로 바꾼 실제 모델 이름 (예: GPT5_MINI_MODEL 값)
+    - 그 외 이름은 ValueError (다른 모델의 API 키 / 프록시로 조용히 보내지 않음,
+      새 모델은 LLM_MODELS / EMBEDDING_MODELS에 접두사와 함께 등록)
+    """
+    name = _ALIASES.get(model, model) if model else default
+    if name in models:
+        prefix, default_model = models[name]
+        return prefix, os.getenv(f"{prefix}_MODEL", default_model)
+
+    for prefix, default_model in models.values():
+        if name == os.getenv(f"{prefix}_MODEL", default_model):
+            return prefix, name
+
+    known = sorted(set(models) | {alias for alias, target in _ALIASES.items() if target in models})
+    raise ValueError(f"알 수 없는 모델: {name!r} (사용 가능: {', '.join(known)})")
+
+
+def _http_client(base_url):
+    """
+    프록시 주소별 공유 동기 HTTP 클라이언트 (호출 측에서 _lock 보유)
+
+    openai 기본 설정(연결 제한, 리다이렉트)을 그대로 쓰는 DefaultHttpxClient를
+    같은 base_url의 LLM / 임베딩 클라이언트가 함께 사용한다.
+    (비동기 클라이언트는 이벤트 루프에 묶이므로 langchain_openai 기본값 사용)
+    """
+    client = _http_clients.get(base_url)
+    if client is None:
+        from openai import DefaultHttpxClient
+
+        client = DefaultHttpxClient()
+        _http_clients[base_url] = client
+    return client
+
+
+def _get_client(provider, prefix, model):
+    base_url = os.getenv(f"{prefix}_BASE_URL")
+    key = (provider, model, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # langchain_openai는 처음 사용할 때 import
+            from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+            cls = ChatOpenAI if provider == "chat" else OpenAIEmbeddings
+            client = cls(
+                api_key=os.getenv(f"{prefix}_API_KEY"),
+                base_url=base_url,
+                model=model,
+                http_client=_http_client(base_url),
+            )
+            _clients[key] = client
+    return client
+
+
+def clear_clients(close_pools=False):
+    """
+    클라이언트 레지스트리 비우기 (다음 get_llm / get_embeddings 호출부터 새로 생성)
+
+    이미 받아 간 클라이언트 (from config import gpt_5_nano 같은 기존 전역 포함)는
+    자기 연결 풀을 계속 쓸 수 있도록 풀을 닫지 않는다. 사용처가 없어지면 함께 정리된다.
+
+    Args:
+        close_pools: True면 연결 풀도 바로 닫음 (이전에 받은 클라이언트는 더 이상 사용 불가,
+                     프로세스 종료 직전 등 모든 클라이언트를 버릴 때만 사용)
+    """
+    with _lock:
+        _clients.clear()
+        if close_pools:
+            for client in _http_clients.values():
+                client.close()
+        _http_clients.clear()
 
-# text-embedding-3-large 설정 (프록시 경유)
-embeddings_large = OpenAIEmbeddings(
-    api_key=os.getenv("EMBEDDING_LARGE_API_KEY"),
-    base_url=os.getenv("EMBEDDING_LARGE_BASE_URL"),
-    model=os.getenv("EMBEDDING_LARGE_MODEL", "text-embedding-3-large")
-)
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 도우미 함수: 동적 모델 변경
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def get_llm(model=(os.getenv("GPT5_MINI_MODEL", "openai/gpt-5-mini"))):
+def get_llm(model=None):
     """
-    동적 LLM 생성 함수 (프록시 기반)
+    LLM 반환 (처음 요청할 때 생성, 이후 같은 객체 재사용)
     
     Args:
-        model_name: 사용할 모델 이름 (gpt_5_nano 또는 gpt_5_mini)
+        model: 모델 이름 ("gpt-5-nano" / "gpt-5-mini", "nano" / "mini",
+               "openai/gpt-5-mini" 같은 실제 모델 이름, 기본값: gpt-5-nano)
     
     Returns:
         설정된 LLM 객체
+    
+    Raises:
+        ValueError: 등록되지 않은 모델 이름
     """
-    if model== os.getenv("GPT5_MINI_MODEL", "openai/gpt-5-mini"):
-        return gpt_5_nano
-    return gpt_5_mini
+    prefix, name = _resolve(model, LLM_MODELS, DEFAULT_LLM)
+    return _get_client("chat", prefix, name)
 
 
-def get_embeddings(model=(os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"))):
+def get_embeddings(model=None):
     """
-    동적 Embeddings 생성 함수
+    Embeddings 반환 (처음 요청할 때 생성, 이후 같은 객체 재사용)
     
     Args:
-        model_name: 사용할 임베딩 모델 이름
+        model: 임베딩 모델 이름 ("text-embedding-3-small" / "text-embedding-3-large",
+               "small" / "large", 기본값: text-embedding-3-small)
     
     Returns:
         설정된 Embeddings 객체
+    
+    Raises:
+        ValueError: 등록되지 않은 모델 이름
     """
-    if model== os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"):              # text-embedding-3-small (기본)
-        return embeddings
-    return embeddings_large
+    prefix, name = _resolve(model, EMBEDDING_MODELS, DEFAULT_EMBEDDING)
+    return _get_client("embeddings", prefix, name)
+
+
+def __getattr__(name):
+    """기존 전역 변수 호환 (from config import gpt_5_nano, embeddings 등 → 지연 생성)"""
+    if name in _LEGACY_GLOBALS:
+        kind, model = _LEGACY_GLOBALS[name]
+        return get_llm(model) if kind == "llm" else get_embeddings(model)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 메인 실행 (테스트용 / 함수 호출 기반으로 변경)
@@ -97,7 +201,7 @@ if __name__ == "__main__":
     
     # 1. 직접 호출 테스트
     print("\n1️⃣ 직접 호출 (gpt_5_nano):", "\n")
-    response1 = gpt_5_nano.invoke(question)
+    response1 = get_llm("gpt-5-nano").invoke(question)
     print(f"   답변: {response1.content}")
     print("-" * 50, "\n")
 